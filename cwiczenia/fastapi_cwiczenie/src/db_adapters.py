@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Optional
+from src.file_storage import LogStorage
 from src.schemas import Product
-import json
+import threading
 
 class IDbAdapter(ABC):
     @abstractmethod
@@ -47,33 +48,45 @@ class InMemoryDbAdapter(IDbAdapter):
 
 
 class JsonFileDbAdapter(IDbAdapter):
-    def __init__(self, file_path: str):
+    """
+    Produkty w pliku JSON Lines z dziennikiem zapisów (src.file_storage.LogStorage):
+    dodanie / zmiana / usunięcie dopisuje jedną linię do <file_path>.wal zamiast
+    przepisywać cały plik, a plik jest co jakiś czas odświeżaną migawką.
+    Jedyną kopią danych są rekordy w LogStorage (zmieniane pod jego blokadą),
+    Product powstaje przy odczycie.
+    """
+
+    def __init__(self, file_path: str, **storage_options):
         self.file_path = file_path
-        self.db = self._load_db()
-
-    def _load_db(self) -> list[Product]:
-        with open(self.file_path, "r") as f:
-            return [Product(**json.loads(line)) for line in f]
-
-    def _save_db(self):
-        with open(self.file_path, "w") as f:
-            json.dump([product.model_dump() for product in self.db], f)
+        self.storage = LogStorage(file_path, key="id", **storage_options)
+        self._next_id = max(self.storage.records, default=0) + 1
+        self._id_lock = threading.Lock()
 
     def add_product(self, product: Product):
-        self.db.append(product)
-        self._save_db()
+        # sam zapis poza blokadą - równoległe zapisy dzielą jeden fsync
+        with self._id_lock:
+            if product.id is None:
+                product = product.model_copy(update={"id": self._next_id})
+            self._next_id = max(self._next_id, product.id + 1)
+        self.storage.put(product.model_dump(mode="json"))
+        return product
 
     def get_product(self, product_id: int) -> Product:
-        return next((product for product in self.db if product.id == product_id), None)
+        data = self.storage.get(product_id)
+        return Product(**data) if data is not None else None
 
     def product_list(self) -> list[Product]:
-        return self.db
+        return [Product(**data) for data in self.storage.values()]
 
     def update_product(self, product_id: int, product: Product):
-        self.db[product_id] = product.model_dump()
-        self._save_db()
+        # zapis pod nowym id (upsert) - licznik nie może go później przydzielić
+        with self._id_lock:
+            self._next_id = max(self._next_id, product_id + 1)
+        self.storage.put(product.model_copy(update={"id": product_id}).model_dump(mode="json"))
 
     def delete_product(self, product_id: int):
-        self.db = [product for product in self.db if product.id != product_id]
-        self._save_db()
-    
\ No newline at end of file
+        if self.storage.get(product_id) is not None:
+            self.storage.delete(product_id)
+
+    def close(self):
+        self.storage.close()
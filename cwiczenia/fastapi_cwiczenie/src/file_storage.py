@@ -0,0 +1,202 @@
+"""
+Trwały magazyn rekordów w plikach: dziennik zapisów (write-ahead log) + migawka.
+
+- <path>      - migawka: JSON Lines, jeden rekord w linii (stary format
+                JsonFileDbAdapter; tablica JSON z dawnego _save_db też się wczyta),
+- <path>.wal  - dziennik: każda zmiana to jedna dopisana linia
+                {"op": "put", "value": {...}} albo {"op": "delete", "id": ...}.
+
+Zapis to dopisanie linii i fsync - O(1), bez przepisywania całego pliku.
+fsync jest wspólny dla zapisów z wielu wątków (group commit): pierwszy
+czekający wątek robi flush + fsync za wszystkie dopisane do tej pory linie,
+reszta tylko czeka na wynik. commit_delay > 0 każe mu chwilę poczekać na
+kolejne zapisy.
+
+Gdy dziennik ma więcej linii niż rekordów w bazie (i co najmniej
+min_log_size), zapisujemy nową migawkę (plik tymczasowy + fsync + os.replace)
+i zaczynamy pusty dziennik - koszt migawki rozkłada się na zapisy, które
+ją wywołały (O(1) zamortyzowane).
+
+Start: wczytanie migawki i odtworzenie tylko dziennika od ostatniej migawki.
+Urwana ostatnia linia (awaria w trakcie dopisywania) jest odcinana. Jeśli
+awaria nastąpiła między nową migawką a wyczyszczeniem dziennika, dziennik
+odtwarza się ponownie - put / delete całych rekordów w tej samej kolejności
+dają ten sam wynik.
+
+    storage = LogStorage("products.jsonl")
+    storage.put({"id": 1, "name": "Product 1", "price": "100"})
+    storage.delete(1)
+    storage.get(1), storage.values()
+    storage.records    # {id: rekord}
+    storage.close()
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class LogStorage:
+    def __init__(self, path: str, key: str = "id", min_log_size: int = 1000, commit_delay: float = 0.0):
+        self.path = path
+        self.log_path = path + ".wal"
+        self.key = key
+        self.min_log_size = min_log_size
+        self.commit_delay = commit_delay
+
+        self._cond = threading.Condition()
+        self._written = 0  # numer ostatniej dopisanej linii dziennika
+        self._synced = 0   # numer ostatniej linii po fsync
+        self._syncing = False
+
+        self.records = self._load_snapshot()
+        self._log_size = self._replay_log()
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        _fsync_dir(self.path)
+
+    def _load_snapshot(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            content = f.read()
+        if content.lstrip().startswith("["):
+            rows = json.loads(content)
+        else:
+            rows = [json.loads(line) for line in content.splitlines() if line.strip()]
+        return {row[self.key]: row for row in rows}
+
+    def _replay_log(self) -> int:
+        if not os.path.exists(self.log_path):
+            return 0
+        size = 0
+        good_offset = 0
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # urwana ostatnia linia - zapis nie został potwierdzony
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    raise ValueError(f"Corrupted log entry in {self.log_path} at byte {good_offset}")
+                self._apply(entry)
+                good_offset += len(line)
+                size += 1
+        if good_offset != os.path.getsize(self.log_path):
+            with open(self.log_path, "r+b") as f:
+                f.truncate(good_offset)
+                f.flush()
+                os.fsync(f.fileno())
+        return size
+
+    def _apply(self, entry: dict) -> None:
+        if entry["op"] == "put":
+            value = entry["value"]
+            self.records[value[self.key]] = value
+        elif entry["op"] == "delete":
+            self.records.pop(entry["id"], None)
+        else:
+            raise ValueError(f"Unknown log operation: {entry['op']}")
+
+    def _append(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._cond:
+            self._apply(entry)
+            self._log.write(line)
+            self._written += 1
+            self._log_size += 1
+            number = self._written
+        self._commit(number)
+
+        with self._cond:
+            if self._log_size >= max(self.min_log_size, len(self.records)):
+                self._compact()
+
+    def _commit(self, number: int) -> None:
+        """Czeka, aż linia `number` będzie po fsync; jeden fsync obsługuje wszystkie czekające wątki."""
+        with self._cond:
+            while self._synced < number:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._cond.wait()
+            else:
+                return
+
+        target = self._synced
+        try:
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            with self._cond:
+                self._log.flush()
+                written = self._written
+            os.fsync(self._log.fileno())
+            target = written
+        finally:
+            with self._cond:
+                self._syncing = False
+                self._synced = max(self._synced, target)
+                self._cond.notify_all()
+
+    def put(self, value: dict) -> None:
+        self._append({"op": "put", "value": value})
+
+    def delete(self, key) -> None:
+        self._append({"op": "delete", "id": key})
+
+    def get(self, key) -> Optional[dict]:
+        return self.records.get(key)
+
+    def values(self) -> list[dict]:
+        """Kopia listy rekordów - bezpieczna, gdy inne wątki w tym czasie zapisują."""
+        with self._cond:
+            return list(self.records.values())
+
+    def compact(self) -> None:
+        """Zapisuje migawkę wszystkich rekordów i zaczyna pusty dziennik."""
+        with self._cond:
+            self._compact()
+
+    def _compact(self) -> None:
+        # wywoływane pod self._cond; plik dziennika podmieniamy, gdy nikt nie robi na nim fsync
+        while self._syncing:
+            self._cond.wait()
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for value in self.records.values():
+                f.write(json.dumps(value, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+
+        # wszystko z dziennika jest już w migawce
+        self._log.close()
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        os.fsync(self._log.fileno())
+        self._log_size = 0
+        self._synced = self._written
+        self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            if self._log.closed:
+                return
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+
+
+def _fsync_dir(path: str) -> None:
+    # utworzenie / podmiana pliku jest trwała dopiero po fsync katalogu (POSIX)
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
 from decimal import Decimal
+from typing import Optional
 
 class Product(BaseModel):
+    id: Optional[int] = None
     name: str
     price: Decimal
     
@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from src.db_adapters import JsonFileDbAdapter
+from src.file_storage import LogStorage
+from src.schemas import Product
+
+
+class LogStorageTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "products.jsonl")
+
+    def open(self, **options):
+        storage = LogStorage(self.path, **options)
+        self.addCleanup(storage.close)
+        return storage
+
+    def log_lines(self):
+        with open(self.path + ".wal", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_replay_after_restart(self):
+        storage = LogStorage(self.path)
+        storage.put({"id": 1, "name": "Product 1"})
+        storage.put({"id": 2, "name": "Product 2"})
+        storage.put({"id": 1, "name": "Product 1b"})
+        storage.delete(2)
+        storage.close()
+        self.assertFalse(os.path.exists(self.path))  # bez migawki - wszystko w dzienniku
+        self.assertEqual(len(self.log_lines()), 4)
+
+        storage = self.open()
+        self.assertEqual(storage.records, {1: {"id": 1, "name": "Product 1b"}})
+
+    def test_torn_tail_is_truncated(self):
+        storage = LogStorage(self.path)
+        storage.put({"id": 1, "name": "Product 1"})
+        storage.close()
+        with open(self.path + ".wal", "a", encoding="utf-8") as f:
+            f.write('{"op": "put", "value": {"id": 2, "na')
+
+        storage = self.open()
+        self.assertEqual(list(storage.records), [1])
+        self.assertEqual(len(self.log_lines()), 1)
+        storage.put({"id": 3, "name": "Product 3"})
+        storage.close()
+
+        storage = self.open()
+        self.assertEqual(list(storage.records), [1, 3])
+
+    def test_corrupted_entry_is_an_error(self):
+        with open(self.path + ".wal", "w", encoding="utf-8") as f:
+            f.write('{"op": "put", "value": {"id": 1}}\nnot json\n{"op": "delete", "id": 1}\n')
+        with self.assertRaises(ValueError):
+            LogStorage(self.path)
+
+    def test_compaction_writes_snapshot(self):
+        storage = self.open(min_log_size=3)
+        storage.put({"id": 1, "name": "Product 1"})
+        storage.put({"id": 2, "name": "Product 2"})
+        self.assertEqual(len(self.log_lines()), 2)
+        storage.put({"id": 1, "name": "Product 1b"})
+        self.assertEqual(self.log_lines(), [])
+        with open(self.path, encoding="utf-8") as f:
+            snapshot = [json.loads(line) for line in f]
+        self.assertEqual(snapshot, [{"id": 1, "name": "Product 1b"}, {"id": 2, "name": "Product 2"}])
+
+        storage.delete(2)
+        storage.close()
+        storage = self.open()
+        self.assertEqual(storage.records, {1: {"id": 1, "name": "Product 1b"}})
+
+    def test_legacy_json_array_is_migrated(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"id": 1, "name": "Product 1"}, {"id": 2, "name": "Product 2"}], f)
+
+        storage = self.open()
+        self.assertEqual(list(storage.records), [1, 2])
+        storage.delete(1)
+        storage.compact()
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), '{"id": 2, "name": "Product 2"}\n')
+
+    def test_concurrent_writes_share_fsync(self):
+        storage = LogStorage(self.path, min_log_size=10_000, commit_delay=0.01)
+        threads, per_thread = 8, 10
+        barrier = threading.Barrier(threads)
+
+        def write(number):
+            barrier.wait()
+            for i in range(per_thread):
+                storage.put({"id": number * per_thread + i, "name": f"Product {number}/{i}"})
+
+        with mock.patch("src.file_storage.os.fsync", wraps=os.fsync) as fsync:
+            workers = [threading.Thread(target=write, args=(number,)) for number in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        storage.close()
+
+        self.assertLess(fsync.call_count, threads * per_thread)
+        storage = self.open()
+        self.assertEqual(sorted(storage.records), list(range(threads * per_thread)))
+
+
+class JsonFileDbAdapterTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "products.jsonl")
+
+    def test_crud_survives_restart(self):
+        db = JsonFileDbAdapter(self.path)
+        first = db.add_product(Product(name="Product 1", price=Decimal("100")))
+        second = db.add_product(Product(name="Product 2", price=Decimal("200")))
+        db.update_product(first.id, Product(name="Product 1b", price=Decimal("150")))
+        db.delete_product(second.id)
+        db.close()
+
+        db = JsonFileDbAdapter(self.path)
+        self.addCleanup(db.close)
+        self.assertEqual(db.product_list(), [Product(id=first.id, name="Product 1b", price=Decimal("150"))])
+        self.assertIsNone(db.get_product(second.id))
+
+    def test_update_of_unknown_id_advances_next_id(self):
+        db = JsonFileDbAdapter(self.path)
+        self.addCleanup(db.close)
+        db.update_product(10, Product(name="Product 10", price=Decimal("10")))
+        added = db.add_product(Product(name="Product 11", price=Decimal("11")))
+        self.assertEqual(added.id, 11)
+        self.assertEqual(db.get_product(10).name, "Product 10")
+
+
+if __name__ == "__main__":
+    unittest.main()
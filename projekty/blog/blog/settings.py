@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 
     "posts",
     "galleries",
+    "images",
+    "files",
 ]
 
 MIDDLEWARE = [
@@ -90,6 +93,36 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# lokalnie locmem, na produkcji Redis: REDIS_URL=redis://localhost:6379/0
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+# posts.fragment_cache - cache fragmentów strony posta
+POSTS_CACHE_ALIAS = "default"
+POSTS_FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# galleries.thumbnails - miniatury generowane po zapisie zdjęcia
+GALLERY_THUMBNAIL_SIZES = ["200x100"]
+GALLERY_THUMBNAIL_WORKERS = None  # None = liczba rdzeni
+
+# images.variants - warianty zdjęć dla srcset (szerokości w px, formaty wg obsługi Pillow)
+IMAGE_VARIANT_WIDTHS = [320, 640, 1024, 1600]
+IMAGE_VARIANT_FORMATS = ["avif", "webp"]
+IMAGE_VARIANT_WORKERS = None  # None = liczba rdzeni
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -130,6 +163,10 @@ MEDIA_URL = "/media/"
 STATIC_ROOT = BASE_DIR / "static"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# files.views.serve - MEDIA i STATIC serwowane przez Django (False, gdy robi to nginx / CDN)
+SERVE_FILES = True
+FILE_SERVING_MAX_AGE = 60 * 60  # nazwy z hashem treści dostają rok i immutable
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
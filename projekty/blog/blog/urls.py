@@ -18,12 +18,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from files.urls import file_patterns
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("posts.urls")),
     path("galleries/", include("galleries.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) + \
-    static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+] + file_patterns(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) + \
+    file_patterns(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.views.static import serve as django_serve
+
+from files.views import serve
+
+CHUNK = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje przepustowość django.views.static.serve z files.views.serve: "
+        "odczyt przez Pythona i os.sendfile (jak gunicorn z wsgi.file_wrapper)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size-mb", type=int, default=256, help="Rozmiar pliku testowego w MB")
+        parser.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń pomiaru")
+        parser.add_argument("--range-kb", type=int, default=512, help="Rozmiar zakresu w żądaniach Range")
+
+    def handle(self, *args, **options):
+        if options["size_mb"] < 1 or options["repeat"] < 1 or options["range_kb"] < 1:
+            raise CommandError("--size-mb, --repeat and --range-kb must be positive")
+        if not hasattr(os, "sendfile"):
+            raise CommandError("os.sendfile is not available on this platform")
+
+        root = tempfile.mkdtemp()
+        try:
+            size = options["size_mb"] * CHUNK
+            with open(os.path.join(root, "data.bin"), "wb") as f:
+                for _ in range(options["size_mb"]):
+                    f.write(os.urandom(CHUNK))
+
+            factory = RequestFactory()
+            full = factory.get("/data.bin")
+            range_length = options["range_kb"] * 1024
+            ranged = factory.get("/data.bin", HTTP_RANGE=f"bytes={size // 2}-{size // 2 + range_length - 1}")
+
+            with open(os.devnull, "wb") as devnull:
+                cases = [
+                    ("django.views.static.serve", lambda: self.iterate(django_serve(full, "data.bin", root)), size),
+                    ("files.serve, iterated in Python", lambda: self.iterate(serve(full, "data.bin", root)), size),
+                    ("files.serve, os.sendfile", lambda: self.sendfile(serve(full, "data.bin", root), devnull), size),
+                    (
+                        f"files.serve Range {options['range_kb']} KB x 100, os.sendfile",
+                        lambda: [self.sendfile(serve(ranged, "data.bin", root), devnull) for _ in range(100)],
+                        range_length * 100,
+                    ),
+                ]
+                for name, func, total in cases:
+                    elapsed = self.measure(func, options["repeat"])
+                    self.stdout.write(f"{name:45} {total / CHUNK / elapsed:10.0f} MB/s")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    def iterate(self, response):
+        for _ in response:
+            pass
+        response.close()
+
+    def sendfile(self, response, out):
+        # to samo co gunicorn: offset = tell(), liczba bajtów = Content-Length
+        source = response.file_to_stream
+        offset, remaining = source.tell(), int(response["Content-Length"])
+        while remaining:
+            sent = os.sendfile(out.fileno(), source.fileno(), offset, remaining)
+            if not sent:
+                break
+            offset += sent
+            remaining -= sent
+        response.close()
+
+    def measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
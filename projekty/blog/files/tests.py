@@ -0,0 +1,100 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase
+
+from .views import serve
+
+# Create your tests here.
+
+
+class ServeTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.data = bytes(range(256)) * 40
+        self.write("css/site.css", b"body { color: red }" * 100)
+        self.write("css/site.0123456789ab.css", b"body {}")
+        self.write("data.bin", self.data)
+        self.factory = RequestFactory()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def get(self, path, **headers):
+        response = serve(self.factory.get("/" + path, headers=headers), path, self.root)
+        self.addCleanup(response.close)
+        return response
+
+    def test_full_file_is_streamed_from_open_file(self):
+        response = self.get("data.bin")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), len(self.data))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        # otwarty plik = wsgi.file_wrapper może użyć sendfile
+        self.assertTrue(hasattr(response.file_to_stream, "fileno"))
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+
+    def test_range(self):
+        response = self.get("data.bin", Range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "100")
+        self.assertEqual(response.file_to_stream.tell(), 100)
+        self.assertEqual(b"".join(response.streaming_content), self.data[100:200])
+
+        suffix = self.get("data.bin", Range="bytes=-10")
+        self.assertEqual(b"".join(suffix.streaming_content), self.data[-10:])
+
+        self.assertEqual(self.get("data.bin", Range=f"bytes={len(self.data)}-").status_code, 416)
+        # kilka zakresów - zwykła odpowiedź 200
+        self.assertEqual(self.get("data.bin", Range="bytes=0-1,5-6").status_code, 200)
+
+    def test_if_range_with_old_etag_returns_whole_file(self):
+        response = self.get("data.bin", Range="bytes=0-9", If_Range='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_conditional_and_cache_headers(self):
+        first = self.get("css/site.css")
+        self.assertEqual(first["Cache-Control"], "public, max-age=3600")
+        self.assertEqual(self.get("css/site.css", If_None_Match=first["ETag"]).status_code, 304)
+        self.assertEqual(self.get("css/site.css", If_Modified_Since=first["Last-Modified"]).status_code, 304)
+
+        hashed = self.get("css/site.0123456789ab.css")
+        self.assertEqual(hashed["Cache-Control"], "public, max-age=31536000, immutable")
+        name = "cas/ab/cd/abcd" + "0" * 60 + ".jpg"
+        self.write(name, b"jpeg")
+        self.assertIn("immutable", self.get(name)["Cache-Control"])
+
+    def test_precompressed(self):
+        compressed = gzip.compress(b"body { color: red }" * 100)
+        self.write("css/site.css.gz", compressed)
+
+        response = self.get("css/site.css", Accept_Encoding="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(b"".join(response.streaming_content), compressed)
+
+        plain = self.get("css/site.css", Accept_Encoding="br, gzip;q=0")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+
+    def test_outside_root_is_404(self):
+        from django.http import Http404
+
+        for path in ["../etc/passwd", "css", "missing.txt"]:
+            with self.assertRaises(Http404):
+                serve(self.factory.get("/x"), path, self.root)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command("benchmark_file_serving", "--size-mb", "1", "--repeat", "1", "--range-kb", "4", stdout=out)
+        self.assertIn("os.sendfile", out.getvalue())
@@ -0,0 +1,23 @@
+import re
+
+from django.conf import settings
+from django.urls import re_path
+
+from . import views
+
+
+def file_patterns(prefix, document_root):
+    """
+    Odpowiednik django.conf.urls.static.static() z files.views.serve.
+    Działa także przy DEBUG = False - wyłącza go SERVE_FILES = False
+    (np. gdy pliki serwuje nginx / CDN).
+    """
+    if not getattr(settings, "SERVE_FILES", True) or not prefix:
+        return []
+    return [
+        re_path(
+            r"^%s(?P<path>.*)$" % re.escape(prefix.lstrip("/")),
+            views.serve,
+            kwargs={"document_root": document_root},
+        ),
+    ]
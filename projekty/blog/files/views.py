@@ -0,0 +1,169 @@
+"""
+Serwowanie plików MEDIA i STATIC przez Django w wersji nadającej się do ruchu.
+
+django.views.static.serve czyta plik w Pythonie blokami, nie obsługuje Range
+i nie ustawia Cache-Control. Ten widok:
+
+- zwraca FileResponse z otwartym plikiem - serwer WSGI z wsgi.file_wrapper
+  (np. gunicorn) wysyła go przez os.sendfile, bez kopiowania przez Pythona,
+- obsługuje "Range: bytes=..." (206 / 416) i If-Range - także przez sendfile,
+  bo plik jest ustawiony na początek zakresu, a Content-Length to długość zakresu,
+- ustawia ETag / Last-Modified i odpowiada 304 na żądania warunkowe,
+- dla nazw z hashem treści (ManifestStaticFilesStorage, images.storage)
+  wysyła "Cache-Control: public, max-age=31536000, immutable",
+- serwuje gotowe pliki .br / .gz obok oryginału, jeżeli klient je akceptuje.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# plik.0123456789ab.css (ManifestStaticFilesStorage), cas/ab/cd/<sha256> i jego warianty
+HASHED_NAME = re.compile(r"(\.[0-9a-f]{12}\.[^/]+$|(^|/)cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64})")
+PRECOMPRESSED = [("br", ".br"), ("gzip", ".gz")]
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ServedFileResponse(FileResponse):
+    # większe bloki, gdy serwer nie ma wsgi.file_wrapper i plik idzie przez Pythona
+    block_size = 256 * 1024
+
+
+class FileRange:
+    """
+    Fragment otwartego pliku od bieżącej pozycji, długości length.
+
+    fileno() i tell() zostają, więc wsgi.file_wrapper nadal może użyć
+    os.sendfile (offset = tell(), liczba bajtów = Content-Length).
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def cache_control(path):
+    if HASHED_NAME.search(path):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={getattr(settings, 'FILE_SERVING_MAX_AGE', 3600)}"
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if re.fullmatch(r"\s*q=0(\.0*)?\s*", params):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    (początek, koniec) włącznie dla "bytes=a-b", "bytes=a-", "bytes=-n".
+    None - nagłówek do zignorowania (np. kilka zakresów), ValueError - zakres poza plikiem.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(0, size - int(last)), size - 1
+        if int(last) == 0:
+            raise ValueError("Unsatisfiable range")
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def serve(request, path, document_root):
+    try:
+        fullpath = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+    # gotowy plik skompresowany tylko dla całych odpowiedzi - zakresy liczymy na oryginale
+    encoding = None
+    range_header = request.headers.get("Range") if request.method in ("GET", "HEAD") else None
+    if not range_header:
+        accepted = accepted_encodings(request)
+        for coding, suffix in PRECOMPRESSED:
+            if coding in accepted and os.path.isfile(fullpath + suffix):
+                encoding, fullpath = coding, fullpath + suffix
+                break
+
+    try:
+        file_stat = os.stat(fullpath)
+    except OSError:
+        raise Http404("File not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("File not found")
+
+    size = file_stat.st_size
+    etag = f'"{file_stat.st_mtime_ns:x}-{size:x}{"-" + encoding if encoding else ""}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(file_stat.st_mtime),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+    }
+
+    template = HttpResponse(headers=headers)
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(file_stat.st_mtime), response=template)
+    if conditional is not template:
+        return conditional
+
+    content_type, _ = mimetypes.guess_type(path)
+    content_type = content_type or "application/octet-stream"
+
+    byte_range = None
+    if range_header and request.headers.get("If-Range", etag) in (etag, headers["Last-Modified"]):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return HttpResponse(status=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    file = open(fullpath, "rb")
+    if byte_range is None:
+        response = ServedFileResponse(file, content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = ServedFileResponse(
+            FileRange(file, end - start + 1), status=206, content_type=content_type, headers=headers,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
@@ -15,5 +15,6 @@ class GalleryAdmin(admin.ModelAdmin):
 @admin.register(GalleryImage)
 class GalleryImageAdmin(admin.ModelAdmin):
     list_display = ("gallery", "image", "alt")
+    list_select_related = ("gallery",)
 
 # Register your models here.
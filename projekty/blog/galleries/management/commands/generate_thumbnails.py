@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from galleries.models import GalleryImage
+from galleries.thumbnails import generate_thumbnails, process_pool
+
+
+class Command(BaseCommand):
+    help = "Generuje brakujące miniatury zdjęć galerii (w kilku procesach, paczkami po id)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+        parser.add_argument("--batch-size", type=int, default=100, help="Liczba zdjęć w jednej paczce")
+        parser.add_argument("--force", action="store_true", help="Generuje ponownie także istniejące miniatury")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or (options["workers"] is not None and options["workers"] < 1):
+            raise CommandError("--batch-size and --workers must be positive")
+
+        generated = 0
+        failed = []
+        last_pk = 0
+        with process_pool(options["workers"]) as executor:
+            while True:
+                images = list(
+                    GalleryImage.objects.filter(pk__gt=last_pk).order_by("pk")[: options["batch_size"]]
+                )
+                if not images:
+                    break
+
+                count, errors = generate_thumbnails(images, executor=executor, force=options["force"])
+                generated += count
+                failed += errors
+                last_pk = images[-1].pk
+
+        for image_id, error in failed:
+            self.stderr.write(f"GalleryImage {image_id}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Generated {generated} thumbnails ({len(failed)} failed)"))
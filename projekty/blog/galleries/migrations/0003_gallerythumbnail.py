@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("galleries", "0002_alter_galleryimage_gallery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GalleryThumbnail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("geometry", models.CharField(max_length=20)),
+                ("source", models.CharField(max_length=255)),
+                ("file", models.ImageField(max_length=255, upload_to="")),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "image",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="thumbnails",
+                        to="galleries.galleryimage",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("image", "geometry"), name="gallery_thumbnail_unique"
+                    )
+                ],
+            },
+        ),
+    ]
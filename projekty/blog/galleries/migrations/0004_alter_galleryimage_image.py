@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:48
+
+import images.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("galleries", "0003_gallerythumbnail"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="galleryimage",
+            name="image",
+            field=models.ImageField(
+                storage=images.storage.content_storage, upload_to="galleries/%Y/%m/%d/"
+            ),
+        ),
+    ]
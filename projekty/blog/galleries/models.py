@@ -1,5 +1,7 @@
 from django.db import models
 
+from images.storage import content_storage
+
 # Create your models here.
 class Gallery(models.Model):
     title = models.CharField(max_length=255)
@@ -9,8 +11,29 @@ class Gallery(models.Model):
     
 class GalleryImage(models.Model):
     gallery = models.ForeignKey(Gallery, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to="galleries/%Y/%m/%d/")
+    image = models.ImageField(upload_to="galleries/%Y/%m/%d/", storage=content_storage)
     alt = models.CharField(max_length=255)
 
     def __str__(self):
         return self.gallery.title
+
+
+class GalleryThumbnail(models.Model):
+    """Miniatura wygenerowana z góry przez galleries.thumbnails (szablony nie używają PIL)."""
+
+    image = models.ForeignKey(GalleryImage, on_delete=models.CASCADE, related_name="thumbnails")
+    geometry = models.CharField(max_length=20)
+    # nazwa pliku oryginału - po podmianie zdjęcia miniatura jest generowana ponownie
+    source = models.CharField(max_length=255)
+    file = models.ImageField(max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["image", "geometry"], name="gallery_thumbnail_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.file.name} ({self.geometry})"
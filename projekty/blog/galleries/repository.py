@@ -0,0 +1,43 @@
+"""
+Odczyt galerii ze zdjęciami w stałej liczbie zapytań.
+
+gallery.images.all() w szablonie, miniatury każdego zdjęcia i
+GalleryImage.__str__ (self.gallery.title) to osobne zapytania dla każdego
+zdjęcia (N+1). get_gallery() pobiera wszystko w 3 zapytaniach:
+
+1. galeria,
+2. jej zdjęcia (z ustawionym image.gallery - bez dodatkowych zapytań),
+3. miniatury tych zdjęć.
+
+Poprzednie / następne zdjęcie wyznaczamy z pozycji na już pobranej liście.
+"""
+from django.db.models import Prefetch
+
+from .models import Gallery, GalleryImage
+
+IMAGE_ORDERING = ("id",)
+
+
+def get_gallery(gallery_id):
+    """Galeria z listą zdjęć w gallery.image_list (Gallery.DoesNotExist, gdy nie ma)."""
+    images = GalleryImage.objects.order_by(*IMAGE_ORDERING).prefetch_related("thumbnails")
+    gallery = Gallery.objects.prefetch_related(
+        Prefetch("images", queryset=images, to_attr="image_list")
+    ).get(pk=gallery_id)
+    gallery.image_positions = {image.pk: position for position, image in enumerate(gallery.image_list)}
+    return gallery
+
+
+def get_image(gallery, image_id):
+    """
+    (zdjęcie, poprzednie, następne) z galerii pobranej przez get_gallery().
+    GalleryImage.DoesNotExist, jeżeli zdjęcie nie należy do tej galerii.
+    """
+    position = gallery.image_positions.get(image_id)
+    if position is None:
+        raise GalleryImage.DoesNotExist(f"Image {image_id} does not belong to gallery {gallery.pk}")
+
+    images = gallery.image_list
+    previous = images[position - 1] if position > 0 else None
+    next_image = images[position + 1] if position + 1 < len(images) else None
+    return images[position], previous, next_image
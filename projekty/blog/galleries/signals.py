@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from images import variants
+
+from . import thumbnails
+from .models import GalleryImage, GalleryThumbnail
+
+
+@receiver(post_save, sender=GalleryImage)
+def schedule_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw:
+        thumbnails.schedule(instance)
+        variants.schedule(instance.image.name)
+
+
+@receiver(post_delete, sender=GalleryThumbnail)
+def delete_thumbnail_file(sender, instance, **kwargs):
+    # inne zdjęcie z tym samym plikiem (storage adresowany treścią) może używać tej miniatury
+    thumbnails.delete_unused_file(instance.file.name)
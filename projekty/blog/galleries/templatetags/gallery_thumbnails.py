@@ -0,0 +1,16 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def gallery_thumbnail(image, geometry):
+    """
+    {% gallery_thumbnail image "200x100" as im %} - zapisany GalleryThumbnail
+    albo None, jeżeli miniatura jeszcze nie powstała. Bez PIL i bez zapisu plików.
+    Przeszukuje image.thumbnails.all(), więc korzysta z prefetch_related.
+    """
+    for thumbnail in image.thumbnails.all():
+        if thumbnail.geometry == geometry:
+            return thumbnail
+    return None
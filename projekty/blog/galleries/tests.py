@@ -1,2 +1,156 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from images.testing import MediaRootMixin, image_file
+
+from .models import Gallery, GalleryImage, GalleryThumbnail
+from .thumbnails import generate_thumbnails
 
 # Create your tests here.
+
+
+@override_settings(GALLERY_THUMBNAILS_ASYNC=False, GALLERY_THUMBNAIL_SIZES=["200x100", "64x64"])
+class ThumbnailPipelineTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.gallery = Gallery.objects.create(title="Wakacje")
+
+    def test_generated_on_save(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file(), alt="Morze")
+
+        thumbnails = {t.geometry: t for t in image.thumbnails.all()}
+        self.assertEqual(set(thumbnails), {"200x100", "64x64"})
+        self.assertEqual((thumbnails["200x100"].width, thumbnails["200x100"].height), (133, 100))
+        with Image.open(thumbnails["64x64"].file.path) as generated:
+            self.assertEqual(generated.size, (64, 48))
+
+        # ponowny zapis (np. zmiana alt) nie skaluje zdjęcia jeszcze raz
+        image.alt = "Plaża"
+        image.save()
+        self.assertEqual(generate_thumbnails([image]), (0, []))
+
+    def test_replaced_image_regenerates_and_removes_old_files(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file("a.png"), alt="")
+        old = image.thumbnails.get(geometry="64x64")
+
+        image.image = image_file("b.png", size=(100, 400))
+        image.save()
+        new = image.thumbnails.get(geometry="64x64")
+        self.assertEqual((new.width, new.height), (16, 64))
+        self.assertFalse(old.file.storage.exists(old.file.name))
+
+        image.delete()
+        self.assertFalse(new.file.storage.exists(new.file.name))
+
+    def test_shared_thumbnail_kept_while_in_use(self):
+        first = GalleryImage.objects.create(gallery=self.gallery, image=image_file("a.png"), alt="")
+        second = GalleryImage.objects.create(gallery=self.gallery, image=image_file("kopia.png"), alt="")
+        shared = second.thumbnails.get(geometry="64x64")
+        self.assertEqual(first.thumbnails.get(geometry="64x64").file.name, shared.file.name)
+
+        first.delete()
+        self.assertTrue(shared.file.storage.exists(shared.file.name))
+
+        second.image = image_file("b.png", color="blue")
+        second.save()
+        self.assertFalse(shared.file.storage.exists(shared.file.name))
+
+    def test_replaced_shared_image_keeps_other_thumbnail(self):
+        first = GalleryImage.objects.create(gallery=self.gallery, image=image_file("a.png"), alt="")
+        second = GalleryImage.objects.create(gallery=self.gallery, image=image_file("kopia.png"), alt="")
+        shared = first.thumbnails.get(geometry="64x64")
+
+        second.image = image_file("b.png", color="blue")
+        second.save()
+        self.assertTrue(shared.file.storage.exists(shared.file.name))
+
+    def test_template_does_not_touch_pil(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file(), alt="Morze")
+        thumbnail = image.thumbnails.get(geometry="200x100")
+
+        opened = []
+        original_open = Image.open
+        Image.open = lambda *args, **kwargs: opened.append(args) or original_open(*args, **kwargs)
+        try:
+            response = self.client.get(reverse("galleries:details", args=[self.gallery.id]))
+        finally:
+            Image.open = original_open
+
+        self.assertContains(response, thumbnail.file.url)
+        self.assertContains(response, 'width="133" height="100"')
+        self.assertEqual(opened, [])
+
+    def test_missing_thumbnail_falls_back_to_original(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file(), alt="Morze")
+        image.thumbnails.all().delete()
+        response = self.client.get(reverse("galleries:details", args=[self.gallery.id]))
+        self.assertContains(response, image.image.url)
+
+
+@override_settings(GALLERY_THUMBNAILS_ASYNC=False, GALLERY_THUMBNAIL_SIZES=["200x100"])
+class GenerateThumbnailsCommandTests(MediaRootMixin, TestCase):
+    def test_backfill_in_processes(self):
+        gallery = Gallery.objects.create(title="Stare zdjęcia")
+        # bulk_create nie wysyła post_save - zdjęcia bez miniatur, jak sprzed wdrożenia
+        images = GalleryImage.objects.bulk_create(
+            GalleryImage(gallery=gallery, image=image_file(f"{i}.png"), alt="") for i in range(3)
+        )
+        broken = GalleryImage.objects.create(gallery=gallery, image="galleries/missing.png", alt="")
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("generate_thumbnails", "--workers", "2", "--batch-size", "2", stdout=out, stderr=err)
+
+        self.assertIn("Generated 3 thumbnails (1 failed)", out.getvalue())
+        self.assertIn(f"GalleryImage {broken.pk}", err.getvalue())
+        self.assertEqual(GalleryThumbnail.objects.filter(image__in=images).count(), 3)
+        self.assertFalse(GalleryThumbnail.objects.filter(image=broken).exists())
+
+
+@override_settings(GALLERY_THUMBNAILS_ASYNC=False, GALLERY_THUMBNAIL_SIZES=["200x100"])
+class GalleryQueryCountTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.gallery = Gallery.objects.create(title="Wakacje")
+        self.other = Gallery.objects.create(title="Inna")
+        self.images = [
+            GalleryImage.objects.create(gallery=self.gallery, image=image_file(f"{i}.png"), alt=f"Zdjęcie {i}")
+            for i in range(5)
+        ]
+        self.foreign = GalleryImage.objects.create(gallery=self.other, image=image_file(), alt="")
+
+    def test_details_query_count_does_not_depend_on_images(self):
+        url = reverse("galleries:details", args=[self.gallery.id])
+        with self.assertNumQueries(3):  # galeria, zdjęcia, miniatury
+            response = self.client.get(url)
+        self.assertEqual(response.content.count(b"<img "), 5)
+
+        GalleryImage.objects.create(gallery=self.gallery, image=image_file(), alt="")
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_str_uses_prefetched_gallery(self):
+        from .repository import get_gallery
+
+        gallery = get_gallery(self.gallery.id)
+        with self.assertNumQueries(0):
+            self.assertEqual([str(image) for image in gallery.image_list], ["Wakacje"] * 5)
+
+    def test_image_details_with_neighbours(self):
+        middle = self.images[2]
+        with self.assertNumQueries(4):  # galeria, zdjęcia, miniatury, warianty zdjęcia (srcset)
+            response = self.client.get(reverse("galleries:image_details", args=[self.gallery.id, middle.id]))
+        self.assertEqual(response.context["previous"], self.images[1])
+        self.assertEqual(response.context["next"], self.images[3])
+
+        first = self.client.get(reverse("galleries:image_details", args=[self.gallery.id, self.images[0].id]))
+        self.assertIsNone(first.context["previous"])
+
+    def test_image_from_other_gallery_is_404(self):
+        response = self.client.get(reverse("galleries:image_details", args=[self.gallery.id, self.foreign.id]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("galleries:details", args=[999]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,175 @@
+"""
+Miniatury zdjęć galerii generowane z góry, a nie w trakcie żądania.
+
+{% thumbnail %} z sorl-thumbnail skaluje zdjęcie przy pierwszym wyświetleniu
+galerii (PIL w żądaniu HTTP) i odkłada wynik w media/cache bez żadnej ewidencji.
+Zamiast tego:
+
+- po zapisie GalleryImage (post_save, po commicie) zadanie trafia do wątku w tle,
+- skalowanie do rozmiarów z GALLERY_THUMBNAIL_SIZES odbywa się w ProcessPoolExecutor
+  (wszystkie rdzenie),
+- wygenerowane warianty zapisujemy w GalleryThumbnail (plik, szerokość, wysokość),
+- szablon ({% gallery_thumbnail %}) tylko czyta te wiersze.
+
+Zaległe zdjęcia: python manage.py generate_thumbnails --workers 4
+GALLERY_THUMBNAILS_ASYNC = False w settings generuje miniatury od razu (np. w testach).
+
+Pliki czytamy i zapisujemy przez storage.path(), więc wymagany jest FileSystemStorage.
+"""
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+DEFAULT_SIZES = ["200x100"]
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_QUALITY = 85
+
+# jeden wątek rozdziela zadania na procesy i zapisuje wyniki w bazie
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gallery-thumbnails")
+_process_pool = None
+
+
+def get_sizes():
+    return list(getattr(settings, "GALLERY_THUMBNAIL_SIZES", DEFAULT_SIZES))
+
+
+def parse_geometry(geometry):
+    """ "200x100" -> (200, 100) """
+    match = re.fullmatch(r"(\d+)x(\d+)", geometry)
+    if not match:
+        raise ValueError(f"Invalid thumbnail geometry: {geometry}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def thumbnail_name(source_name, geometry):
+    root, _ = os.path.splitext(source_name)
+    return f"{THUMBNAIL_DIR}/{geometry}/{root}.jpg"
+
+
+def render_thumbnail(source_path, target_path, geometry):
+    """
+    Skaluje zdjęcie tak, żeby mieściło się w geometry (jak domyślny
+    {% thumbnail %}), zapisuje JPEG i zwraca (szerokość, wysokość).
+
+    Funkcja jest na poziomie modułu i nie używa ORM, żeby dało się ją
+    uruchomić w ProcessPoolExecutor.
+    """
+    size = parse_geometry(geometry)
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.LANCZOS)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        # zapis do pliku tymczasowego - nikt nie zobaczy połowy miniatury
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
+        image.save(tmp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        os.replace(tmp_path, target_path)
+        return image.size
+
+
+def delete_unused_file(name):
+    """
+    Usuwa plik miniatury, jeśli nie wskazuje na niego żaden GalleryThumbnail.
+
+    Nazwa miniatury pochodzi od nazwy zdjęcia w storage adresowanym treścią,
+    więc kilka GalleryImage z tym samym plikiem dzieli te same miniatury.
+    """
+    from .models import GalleryThumbnail
+
+    if name and not GalleryThumbnail.objects.filter(file=name).exists():
+        default_storage.delete(name)
+
+
+def generate_thumbnails(images, sizes=None, executor=None, force=False):
+    """
+    Generuje brakujące (albo nieaktualne) miniatury dla listy GalleryImage.
+
+    Z executor (ProcessPoolExecutor) skalowanie idzie równolegle, bez niego
+    po kolei w bieżącym procesie. Zwraca (liczba miniatur, [(image_id, błąd)]).
+    """
+    from .models import GalleryThumbnail
+
+    sizes = sizes or get_sizes()
+    images = [image for image in images if image.image]
+    existing = {
+        (thumbnail.image_id, thumbnail.geometry): thumbnail
+        for thumbnail in GalleryThumbnail.objects.filter(image__in=images)
+    }
+
+    tasks = []
+    for image in images:
+        for geometry in sizes:
+            current = existing.get((image.pk, geometry))
+            if current and current.source == image.image.name and not force:
+                continue
+            name = thumbnail_name(image.image.name, geometry)
+            args = (image.image.path, default_storage.path(name), geometry)
+            future = executor.submit(render_thumbnail, *args) if executor else None
+            tasks.append((image, geometry, name, args, future))
+
+    thumbnails = []
+    failed = []
+    for image, geometry, name, args, future in tasks:
+        try:
+            width, height = future.result() if future else render_thumbnail(*args)
+        except OSError as e:  # brak pliku, uszkodzony obraz (UnidentifiedImageError)
+            failed.append((image.pk, str(e)))
+            continue
+        thumbnails.append(GalleryThumbnail(
+            image=image, geometry=geometry, source=image.image.name,
+            file=name, width=width, height=height,
+        ))
+
+    GalleryThumbnail.objects.bulk_create(
+        thumbnails,
+        update_conflicts=True,
+        unique_fields=["image", "geometry"],
+        update_fields=["source", "file", "width", "height", "generated_at"],
+    )
+
+    # miniatury podmienionych zdjęć
+    for thumbnail in thumbnails:
+        old = existing.get((thumbnail.image_id, thumbnail.geometry))
+        if old and old.file.name != thumbnail.file.name:
+            delete_unused_file(old.file.name)
+
+    return len(thumbnails), failed
+
+
+def process_pool(workers=None):
+    """ProcessPoolExecutor do skalowania; spawn, bo startujemy go z wątku w tle."""
+    return ProcessPoolExecutor(
+        max_workers=workers or getattr(settings, "GALLERY_THUMBNAIL_WORKERS", None) or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _run_in_thread(image_id):
+    global _process_pool
+    from .models import GalleryImage
+
+    close_old_connections()
+    try:
+        if _process_pool is None:
+            _process_pool = process_pool()
+        image = GalleryImage.objects.filter(pk=image_id).first()
+        if image is not None:
+            generate_thumbnails([image], executor=_process_pool)
+    finally:
+        close_old_connections()
+
+
+def schedule(image):
+    if getattr(settings, "GALLERY_THUMBNAILS_ASYNC", True):
+        # wątek musi widzieć zapisane zdjęcie, więc startujemy po commicie
+        transaction.on_commit(lambda: _executor.submit(_run_in_thread, image.pk))
+    else:
+        generate_thumbnails([image])
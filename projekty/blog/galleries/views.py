@@ -1,16 +1,26 @@
+from django.http import Http404
 from django.shortcuts import render
 from .models import Gallery, GalleryImage
+from . import repository
 
 def gallery_list(request):
     galleries = Gallery.objects.all()
     return render(request, "galleries/list.html", {"galleries": galleries})
 
 def img_details(request, id, img_id):
-    gallery = Gallery.objects.get(id=id)
-    image = GalleryImage.objects.get(id=img_id)
-    return render(request, "galleries/image_details.html", {"gallery": gallery, "image": image})
+    try:
+        gallery = repository.get_gallery(id)
+        image, previous, next_image = repository.get_image(gallery, img_id)
+    except (Gallery.DoesNotExist, GalleryImage.DoesNotExist):
+        raise Http404("Image not found")
+    return render(request, "galleries/image_details.html", {
+        "gallery": gallery, "image": image, "previous": previous, "next": next_image,
+    })
 
 # Create your views here.
 def gallery_details(request, id):
-    gallery = Gallery.objects.get(id=id)
+    try:
+        gallery = repository.get_gallery(id)
+    except Gallery.DoesNotExist:
+        raise Http404("Gallery not found")
     return render(request, "galleries/details.html", {"gallery": gallery})
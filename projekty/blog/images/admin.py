@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import ImageVariant
+
+
+@admin.register(ImageVariant)
+class ImageVariantAdmin(admin.ModelAdmin):
+    list_display = ("source", "format", "width", "height", "size", "generated_at")
+    list_filter = ("format",)
+    search_fields = ("source",)
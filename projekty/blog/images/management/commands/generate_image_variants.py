@@ -0,0 +1,37 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from galleries.models import GalleryImage
+from images.variants import generate_variants, process_pool
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Generuje brakujące warianty (srcset) zdjęć galerii i postów, w kilku procesach"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+        parser.add_argument("--batch-size", type=int, default=100, help="Liczba zdjęć w jednej paczce")
+        parser.add_argument("--force", action="store_true", help="Generuje ponownie także istniejące warianty")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or (options["workers"] is not None and options["workers"] < 1):
+            raise CommandError("--batch-size and --workers must be positive")
+
+        # jeden plik użyty w kilku miejscach (storage adresowany treścią) przetwarzamy raz
+        names = set(GalleryImage.objects.values_list("image", flat=True).distinct())
+        names |= set(Post.objects.exclude(image="").exclude(image=None).values_list("image", flat=True).distinct())
+        names = iter(sorted(names))
+
+        generated = 0
+        failed = []
+        with process_pool(options["workers"]) as executor:
+            while batch := list(islice(names, options["batch_size"])):
+                count, errors = generate_variants(batch, executor=executor, force=options["force"])
+                generated += count
+                failed += errors
+
+        for name, error in failed:
+            self.stderr.write(f"{name}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Generated {generated} variants ({len(failed)} failed)"))
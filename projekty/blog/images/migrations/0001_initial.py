@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageVariant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(db_index=True, max_length=255)),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[("avif", "AVIF"), ("webp", "WebP")], max_length=10
+                    ),
+                ),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                ("file", models.ImageField(max_length=255, upload_to="")),
+                (
+                    "size",
+                    models.PositiveIntegerField(help_text="Rozmiar pliku w bajtach"),
+                ),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "format", "width"),
+                        name="image_variant_unique",
+                    )
+                ],
+            },
+        ),
+    ]
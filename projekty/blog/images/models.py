@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class ImageVariant(models.Model):
+    """
+    Przeskalowana kopia zdjęcia w nowoczesnym formacie (images.variants).
+
+    Wiersze są przypisane do pliku źródłowego (source), a nie do obiektu:
+    to samo zdjęcie użyte w kilku miejscach ma jeden zestaw wariantów.
+    """
+
+    FORMAT_CHOICES = [
+        ("avif", "AVIF"),
+        ("webp", "WebP"),
+    ]
+
+    source = models.CharField(max_length=255, db_index=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.ImageField(max_length=255)
+    size = models.PositiveIntegerField(help_text="Rozmiar pliku w bajtach")
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "format", "width"], name="image_variant_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.source} ({self.format}, {self.width}w)"
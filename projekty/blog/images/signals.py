@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# wysyłany po wygenerowaniu wariantów pliku: variants_generated.send(sender=ImageVariant, source=name)
+variants_generated = Signal()
@@ -0,0 +1,53 @@
+"""
+Storage adresowany treścią (content-addressed).
+
+Nazwa pliku to skrót SHA-256 jego zawartości: cas/ab/cd/abcd...ef.jpg.
+To samo zdjęcie wgrane kilka razy (do kilku galerii, do posta i galerii)
+zajmuje na dysku jedno miejsce, a warianty (images.variants) generujemy
+dla niego tylko raz.
+
+Katalog jest ten sam co MEDIA_ROOT, więc pliki zapisane wcześniej pod
+starymi nazwami (galleries/2025/...) nadal działają.
+
+Plików nie kasujemy przy usuwaniu obiektu - mogą być używane przez inne.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+PREFIX = "cas"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, **kwargs):
+        # zapis pod istniejącą nazwą = ta sama treść, nadpisanie niczego nie psuje
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        hexdigest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        return f"{PREFIX}/{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}"
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, "chunks"):
+            return super().save(name, content, max_length)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+
+_storage = None
+
+
+def content_storage():
+    """Callable dla storage= w polach modeli (migracje nie zapisują instancji)."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
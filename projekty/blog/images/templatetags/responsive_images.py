@@ -0,0 +1,35 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from images.models import ImageVariant
+from images.variants import get_formats
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, alt="", sizes="100vw", css_class=""):
+    """
+    {% responsive_image post.image alt=post.title sizes="(max-width: 768px) 100vw, 50vw" css_class="img-fluid" %}
+
+    <picture> z <source srcset="..."> dla każdego formatu (AVIF przed WebP)
+    i <img> z oryginałem dla starszych przeglądarek. Warianty czyta z
+    ImageVariant (jedno zapytanie), dopóki ich nie ma - sam oryginał.
+    """
+    if not image:
+        return ""
+
+    variants = list(ImageVariant.objects.filter(source=image.name).order_by("width"))
+    sources = []
+    for format in get_formats():
+        srcset = ", ".join(f"{variant.file.url} {variant.width}w" for variant in variants if variant.format == format)
+        if srcset:
+            sources.append((format, srcset, sizes))
+
+    # wymiary największego wariantu - przeglądarka rezerwuje miejsce przed pobraniem
+    dimensions = format_html(' width="{}" height="{}"', variants[-1].width, variants[-1].height) if variants else ""
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" loading="lazy" decoding="async"{}></picture>',
+        format_html_join("", '<source type="image/{}" srcset="{}" sizes="{}">', sources),
+        image.url, alt, css_class, dimensions,
+    )
@@ -0,0 +1,27 @@
+"""Pomocnicze narzędzia do testów aplikacji ze zdjęciami (images, galleries, posts)."""
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+
+def image_file(name="photo.png", size=(640, 480), color="red"):
+    """Plik PNG w pamięci - jak zdjęcie przesłane formularzem."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class MediaRootMixin:
+    """MEDIA_ROOT w katalogu tymczasowym, usuwanym po teście."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
@@ -0,0 +1,96 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, features
+
+from galleries.models import Gallery, GalleryImage
+from posts.models import Post
+
+from .models import ImageVariant
+from .storage import content_storage
+from .testing import MediaRootMixin, image_file
+from .variants import generate_variants
+
+# Create your tests here.
+
+
+# szerokości wariantów (320, 640, 1600) mają się zmieścić w oryginale
+SOURCE_SIZE = (1200, 800)
+
+
+@override_settings(
+    IMAGE_VARIANTS_ASYNC=False,
+    IMAGE_VARIANT_WIDTHS=[320, 640, 1600],
+    IMAGE_VARIANT_FORMATS=["webp"],
+    GALLERY_THUMBNAILS_ASYNC=False,
+)
+class ImageVariantTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.gallery = Gallery.objects.create(title="Wakacje")
+
+    def test_duplicate_uploads_share_file_and_variants(self):
+        first = GalleryImage.objects.create(gallery=self.gallery, image=image_file("a.png", size=SOURCE_SIZE), alt="")
+        second = GalleryImage.objects.create(gallery=self.gallery, image=image_file("kopia.PNG", size=SOURCE_SIZE), alt="")
+        other = GalleryImage.objects.create(gallery=self.gallery, image=image_file(size=SOURCE_SIZE, color="blue"), alt="")
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r"^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertEqual(ImageVariant.objects.filter(source=first.image.name).count(), 3)
+
+    def test_widths_are_capped_at_original(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file(size=SOURCE_SIZE), alt="")
+        variants = ImageVariant.objects.filter(source=image.image.name).order_by("width")
+        self.assertEqual([(v.width, v.height) for v in variants], [(320, 213), (640, 427), (1200, 800)])
+
+        variant = variants[0]
+        with Image.open(variant.file.path) as generated:
+            self.assertEqual((generated.format, generated.size), ("WEBP", (320, 213)))
+        self.assertLess(variant.size, image.image.size)
+
+    @override_settings(IMAGE_VARIANT_FORMATS=["avif", "webp"])
+    def test_srcset_tag(self):
+        image = GalleryImage.objects.create(gallery=self.gallery, image=image_file(size=SOURCE_SIZE), alt="Morze")
+        html = Template(
+            '{% load responsive_images %}{% responsive_image image.image alt=image.alt sizes="50vw" %}'
+        ).render(Context({"image": image}))
+
+        webp = ImageVariant.objects.get(source=image.image.name, format="webp", width=640)
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn(f"{webp.file.url} 640w", html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn(f'<img src="{image.image.url}" alt="Morze"', html)
+        if features.check("avif"):
+            self.assertLess(html.index("image/avif"), html.index("image/webp"))
+
+    def test_post_page_refreshed_when_variants_are_ready(self):
+        author = User.objects.create_user("author", password="secret")
+        with override_settings(IMAGE_VARIANTS_ASYNC=True):
+            # warianty jeszcze nie gotowe (zadanie w tle czeka na commit)
+            post = Post.objects.create(
+                title="Zdjęcie", content="x", author=author, status="published", image=image_file(size=SOURCE_SIZE),
+            )
+        url = reverse("posts:details", args=[post.id])
+        self.client.force_login(User.objects.create_user("reader"))
+        self.assertNotContains(self.client.get(url), "srcset")
+
+        generate_variants([post.image.name])
+        self.assertContains(self.client.get(url), "srcset")
+
+    def test_backfill_command(self):
+        name = content_storage().save("old.png", image_file(size=SOURCE_SIZE))
+        Post.objects.bulk_create([
+            Post(title="Stary", content="", author=User.objects.create_user("author"), image=name),
+        ])
+        broken = GalleryImage.objects.create(gallery=self.gallery, image="galleries/missing.png", alt="")
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("generate_image_variants", "--workers", "2", stdout=out, stderr=err)
+        self.assertIn("Generated 3 variants (1 failed)", out.getvalue())
+        self.assertIn(broken.image.name, err.getvalue())
+        self.assertEqual(ImageVariant.objects.filter(source=name).count(), 3)
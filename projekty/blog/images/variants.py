@@ -0,0 +1,156 @@
+"""
+Warianty zdjęć dla <picture> / srcset: kilka szerokości, WebP i AVIF.
+
+Wgrane zdjęcia (GalleryImage.image, Post.image) serwujemy w oryginale -
+często kilka MB dla telefonu z ekranem 400px. Tutaj:
+
+- po zapisie obiektu ze zdjęciem schedule(name) zleca generowanie wariantów
+  (wątek w tle + ProcessPoolExecutor, jak galleries.thumbnails),
+- dla każdej szerokości z IMAGE_VARIANT_WIDTHS mniejszej od oryginału
+  (i dla samego oryginału) zapisujemy plik w każdym formacie z
+  IMAGE_VARIANT_FORMATS, który obsługuje zainstalowany Pillow,
+- wynik trafia do ImageVariant, a {% responsive_image %} buduje z niego srcset.
+
+Warianty są przypisane do nazwy pliku; z images.storage (nazwa = skrót
+treści) duplikaty mają jeden zestaw wariantów.
+
+Zaległe zdjęcia: python manage.py generate_image_variants --workers 4
+IMAGE_VARIANTS_ASYNC = False w settings generuje warianty od razu (np. w testach).
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from .signals import variants_generated
+
+DEFAULT_WIDTHS = [320, 640, 1024, 1600]
+DEFAULT_FORMATS = ["avif", "webp"]
+QUALITY = {"avif": 60, "webp": 80}
+VARIANT_DIR = "variants"
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+_process_pool = None
+
+
+def get_widths():
+    return sorted(getattr(settings, "IMAGE_VARIANT_WIDTHS", DEFAULT_WIDTHS))
+
+
+def get_formats():
+    """Formaty z ustawień, które potrafi zapisać zainstalowany Pillow."""
+    return [
+        format for format in getattr(settings, "IMAGE_VARIANT_FORMATS", DEFAULT_FORMATS)
+        if features.check(format)
+    ]
+
+
+def variant_dir(source_name):
+    root, _ = os.path.splitext(source_name)
+    return f"{VARIANT_DIR}/{root}"
+
+
+def render_variants(source_path, media_root, directory, widths, formats):
+    """
+    Zapisuje warianty zdjęcia i zwraca listę (format, szerokość, wysokość, nazwa, rozmiar).
+    Szerokości większe od oryginału pomijamy - zamiast nich jest oryginalna.
+
+    Funkcja jest na poziomie modułu i nie używa ORM, żeby dało się ją
+    uruchomić w ProcessPoolExecutor.
+    """
+    results = []
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        target_widths = [width for width in widths if width < image.width] + [image.width]
+        os.makedirs(os.path.join(media_root, directory), exist_ok=True)
+
+        for width in target_widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for format in formats:
+                name = f"{directory}/{width}.{format}"
+                path = os.path.join(media_root, name)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, format.upper(), quality=QUALITY.get(format, 80))
+                os.replace(tmp_path, path)
+                results.append((format, width, height, name, os.path.getsize(path)))
+    return results
+
+
+def generate_variants(names, executor=None, force=False):
+    """
+    Generuje warianty dla plików (nazw w storage), które ich jeszcze nie mają.
+
+    Z executor (ProcessPoolExecutor) skalowanie idzie równolegle, bez niego
+    po kolei w bieżącym procesie. Zwraca (liczba wariantów, [(nazwa, błąd)]).
+    """
+    from .models import ImageVariant
+
+    names = sorted({name for name in names if name})
+    if not force:
+        done = set(ImageVariant.objects.filter(source__in=names).values_list("source", flat=True))
+        names = [name for name in names if name not in done]
+
+    widths, formats = get_widths(), get_formats()
+    tasks = []
+    for name in names:
+        args = (default_storage.path(name), str(settings.MEDIA_ROOT), variant_dir(name), widths, formats)
+        future = executor.submit(render_variants, *args) if executor else None
+        tasks.append((name, args, future))
+
+    created = 0
+    failed = []
+    for name, args, future in tasks:
+        try:
+            results = future.result() if future else render_variants(*args)
+        except OSError as e:  # brak pliku, uszkodzony obraz (UnidentifiedImageError)
+            failed.append((name, str(e)))
+            continue
+
+        with transaction.atomic():
+            ImageVariant.objects.filter(source=name).delete()
+            ImageVariant.objects.bulk_create(
+                ImageVariant(source=name, format=format, width=width, height=height, file=file, size=size)
+                for format, width, height, file, size in results
+            )
+        created += len(results)
+        variants_generated.send(sender=ImageVariant, source=name)
+
+    return created, failed
+
+
+def process_pool(workers=None):
+    """ProcessPoolExecutor do skalowania; spawn, bo startujemy go z wątku w tle."""
+    return ProcessPoolExecutor(
+        max_workers=workers or getattr(settings, "IMAGE_VARIANT_WORKERS", None) or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _run_in_thread(name):
+    global _process_pool
+
+    close_old_connections()
+    try:
+        if _process_pool is None:
+            _process_pool = process_pool()
+        generate_variants([name], executor=_process_pool)
+    finally:
+        close_old_connections()
+
+
+def schedule(name):
+    if not name:
+        return
+    if getattr(settings, "IMAGE_VARIANTS_ASYNC", True):
+        # wątek musi widzieć zapisany obiekt, więc startujemy po commicie
+        transaction.on_commit(lambda: _executor.submit(_run_in_thread, name))
+    else:
+        generate_variants([name])
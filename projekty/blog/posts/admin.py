@@ -1,7 +1,10 @@
-from django.contrib import admin
-from .models import Post
-from django.db.models.functions import Length
-from django.db.models import F
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import BulkActionJob, Post
+from . import bulk_actions
+from .search import search_posts
 class ContentLengthFilter(admin.SimpleListFilter):
     title = "Content length"
     parameter_name = "content_length"
@@ -15,8 +18,7 @@ class ContentLengthFilter(admin.SimpleListFilter):
     
 
     def queryset(self, request, queryset):
-        queryset = queryset.annotate(content_length=Length('content'))
-
+        # content_length jest zapisanym, zaindeksowanym polem - zwykły range scan
         if self.value() == "short":
             return queryset.filter(content_length__lt=15)
         if self.value() == "medium":
@@ -36,10 +38,11 @@ class IsProfitableFilter(admin.SimpleListFilter):
         )
     
     def queryset(self, request, queryset):
-        if self.value() == "yes":   
-            return queryset.filter(price__gt=F('production_cost'))
+        # is_profitable to zaindeksowana kolumna wyliczana przez bazę
+        if self.value() == "yes":
+            return queryset.profitable()
         if self.value() == "no":
-            return queryset.filter(price__lte=F('production_cost'))
+            return queryset.profitable(False)
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ("title", "author", "status", "posted_at", "get_short_content", "get_short_content2")
@@ -50,16 +53,55 @@ class PostAdmin(admin.ModelAdmin):
 
     actions = ["mark_as_draft", "mark_as_published"]
 
+    def get_search_results(self, request, queryset, search_term):
+        # indeks pełnotekstowy (posts.search) zamiast LIKE '%...%' po search_fields
+        if not search_term:
+            return queryset, False
+        results = search_posts(search_term, queryset)
+        # wyniki idą od najtrafniejszych, chyba że wybrano sortowanie po kolumnie
+        if ORDER_VAR in request.GET:
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
+
+
     def get_short_content2(self, obj):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
 
 
+    def _enqueue(self, request, action, queryset):
+        job = bulk_actions.enqueue(action, queryset, user=request.user)
+        url = reverse("admin:posts_bulkactionjob_change", args=[job.pk])
+        self.message_user(
+            request,
+            format_html('Started "{}" in the background - <a href="{}">progress of job #{}</a>', action, url, job.pk),
+            messages.INFO,
+        )
+
+
     def mark_as_draft(self, request, queryset):
-        queryset.update(status="draft")
+        self._enqueue(request, "mark_as_draft", queryset)
 
 
     def mark_as_published(self, request, queryset):
-        queryset.update(status="published")
+        self._enqueue(request, "mark_as_published", queryset)
+
+
+@admin.register(BulkActionJob)
+class BulkActionJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "get_progress", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "action")
+    readonly_fields = ("action", "status", "get_progress", "total", "processed", "error", "created_by", "created_at", "finished_at")
+    fields = readonly_fields
+
+    @admin.display(description="Progress")
+    def get_progress(self, obj):
+        return f"{obj.processed}/{obj.total if obj.total is not None else '?'} ({obj.progress}%)"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 
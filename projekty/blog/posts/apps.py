@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_search_index(using, **kwargs):
+    from django.db import connections
+    from . import search
+
+    search.repair(connections[using])
 
 
 class PostsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "posts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(repair_search_index, sender=self)
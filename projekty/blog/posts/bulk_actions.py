@@ -0,0 +1,87 @@
+"""
+Masowe akcje admina wykonywane w tle, w paczkach po kluczu głównym.
+
+Jedno queryset.update() na całej tabeli trzyma blokadę zapisu sqlite przez cały
+czas trwania i może nie zmieścić się w czasie żądania HTTP. Zamiast tego:
+
+- akcja tworzy BulkActionJob i od razu zwraca odpowiedź,
+- wątek roboczy aktualizuje wiersze paczkami po chunk_size (po pk rosnąco),
+  każda paczka w osobnej, krótkiej transakcji,
+- po każdej paczce zapisuje postęp w BulkActionJob.processed.
+
+BULK_ACTIONS_ASYNC = False w settings wykonuje zadanie od razu (np. w testach).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import BulkActionJob, Post
+
+
+ACTIONS = {
+    "mark_as_draft": lambda queryset: queryset.unpublish(),
+    "mark_as_published": lambda queryset: queryset.publish(),
+}
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# jeden wątek = zadania wykonują się po kolei i nie walczą o blokadę zapisu
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-actions")
+
+
+def run_job(job_id, queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    job = BulkActionJob.objects.get(pk=job_id)
+    apply = ACTIONS[job.action]
+    try:
+        BulkActionJob.objects.filter(pk=job_id).update(status="running", total=queryset.count())
+
+        last_pk = 0
+        processed = 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+
+            with transaction.atomic():
+                apply(Post.objects.filter(pk__in=pks))
+
+            processed += len(pks)
+            last_pk = pks[-1]
+            BulkActionJob.objects.filter(pk=job_id).update(processed=processed)
+
+        BulkActionJob.objects.filter(pk=job_id).update(status="done", finished_at=timezone.now())
+    except Exception as e:
+        BulkActionJob.objects.filter(pk=job_id).update(
+            status="failed", error=str(e), finished_at=timezone.now()
+        )
+        raise
+
+
+def _run_in_thread(job_id, queryset, chunk_size):
+    close_old_connections()
+    try:
+        run_job(job_id, queryset, chunk_size)
+    finally:
+        close_old_connections()
+
+
+def enqueue(action, queryset, user=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown bulk action: {action}")
+
+    job = BulkActionJob.objects.create(action=action, created_by=user)
+    # zadanie dostaje tylko filtr (leniwy queryset), wiersze pobiera samo, paczkami
+    queryset = queryset.order_by()
+
+    if getattr(settings, "BULK_ACTIONS_ASYNC", True):
+        # zapis joba musi być widoczny dla wątku, więc startujemy po commicie
+        transaction.on_commit(lambda: _executor.submit(_run_in_thread, job.pk, queryset, chunk_size))
+    else:
+        run_job(job.pk, queryset, chunk_size)
+    return job
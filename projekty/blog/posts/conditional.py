@@ -0,0 +1,97 @@
+"""
+Warunkowy GET (ETag / Last-Modified) dla widoków postów.
+
+Walidatory liczymy tanim zapytaniem - dla listy jest to jeden agregat
+(MAX(updated_at), COUNT(*)) po indeksie (status, updated_at), dla posta
+odczyt updated_at. Gdy klient przyśle pasujący If-None-Match /
+If-Modified-Since, django.views.decorators.http.condition zwraca 304 bez
+wywołania widoku - bez renderowania szablonu i serializacji.
+
+Listy (HTML i API) mają tylko ETag: usunięcie posta innego niż ostatnio
+zmieniony nie zmienia MAX(updated_at), więc Last-Modified listy dawałby 304
+z usuniętym postem. ETag zawiera COUNT(*), więc usunięcie go zmienia.
+
+Strony HTML zawierają nazwę użytkownika i token CSRF, więc ich ETag zależy
+też od użytkownika i ciasteczka CSRF.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Post
+
+
+def make_etag(*parts):
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def queryset_state(request, name, queryset):
+    # agregat liczymy raz na żądanie
+    states = request.__dict__.setdefault("_conditional_states", {})
+    if name not in states:
+        states[name] = queryset.aggregate(last_modified=Max("updated_at"), count=Count("id"))
+    return states[name]
+
+
+def _user_parts(request):
+    return request.user.pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+
+
+def _is_read(request):
+    return request.method in ("GET", "HEAD")
+
+
+def posts_list_state(request):
+    return queryset_state(request, "posts_list", Post.objects.filter(status="published"))
+
+
+def posts_list_etag(request):
+    if not _is_read(request):
+        return None
+    state = posts_list_state(request)
+    return make_etag("posts_list", state["last_modified"], state["count"], request.GET.urlencode(), *_user_parts(request))
+
+
+def post_details_state(request, post_id):
+    states = request.__dict__.setdefault("_conditional_states", {})
+    if "post_details" not in states:
+        states["post_details"] = (
+            Post.objects.filter(id=post_id, status="published").values_list("updated_at", flat=True).first()
+        )
+    return states["post_details"]
+
+
+def post_details_etag(request, post_id):
+    if not _is_read(request):
+        return None
+    updated_at = post_details_state(request, post_id)
+    if updated_at is None:
+        return None
+    return make_etag("post_details", post_id, updated_at, *_user_parts(request))
+
+
+def post_details_last_modified(request, post_id):
+    return post_details_state(request, post_id) if _is_read(request) else None
+
+
+def api_etag(name, queryset_func):
+    """
+    Funkcja ETag dla API: queryset_func(request) zwraca przefiltrowany
+    queryset albo rzuca ValueError (widok zwróci wtedy 400).
+    """
+
+    def state(request):
+        try:
+            queryset = queryset_func(request)
+        except ValueError:
+            return None
+        return queryset_state(request, name, queryset)
+
+    def etag(request, *args, **kwargs):
+        current = state(request)
+        if current is None:
+            return None
+        return make_etag(name, current["last_modified"], current["count"], request.GET.urlencode())
+
+    return etag
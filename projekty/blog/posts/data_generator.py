@@ -1,5 +1,5 @@
 """
-Stwórz funkcję, która wygeneruje n losowych postów. 
+Stwórz funkcję, która wygeneruje n losowych postów.
 
 - losowy tytuł
 - losowa treść o różnej długości (100 - 2000 znaków)
@@ -15,31 +15,102 @@ python manage.py shell
 from posts.data_generator import generate_posts
 generate_posts(100)
 
-
+albo komendą (szybciej - bulk_create, opcjonalnie kilka procesów):
+python manage.py generate_posts --count 1000000 --batch-size 5000 --workers 4 --seed 42
 
 """
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from faker import Faker
 
+from django.utils import timezone
+from django.utils.text import slugify
+
 from posts.models import Post
 from django.contrib.auth.models import User
 
 
+STATUSES = ["published", "draft"]
+
+
+def generate_rows(count, language="pl_PL", seed=None):
+    """
+    Generuje teksty postów: listę krotek (title, content, status).
 
-def generate_posts(n, language="pl_PL"):
+    Funkcja jest na poziomie modułu, żeby dało się ją uruchomić w ProcessPoolExecutor.
+    """
     faker = Faker(language)
-    authors = User.objects.all()
-    statuses = ["published", "draft"]
-    for _ in range(n):
+    if seed is not None:
+        faker.seed_instance(seed)
+
+    rows = []
+    for _ in range(count):
         title = faker.sentence()
 
         content_length = faker.random_int(100, 2000)
         content = faker.text(content_length)
 
-        author = faker.random_element(authors)
-        status = faker.random_element(statuses)
-
-        post = Post(title=title, content=content, author=author, status=status)
-        post.save()
-
-    print(f"Generated {n} posts")
-
+        status = faker.random_element(STATUSES)
+        rows.append((title, content, status))
+    return rows
+
+
+def _batches(n, batch_size, seed):
+    for i, start in enumerate(range(0, n, batch_size)):
+        batch_seed = None if seed is None else seed + i
+        yield min(batch_size, n - start), batch_seed
+
+
+def _generated_batches(n, batch_size, language, workers, seed):
+    if workers <= 1:
+        for count, batch_seed in _batches(n, batch_size, seed):
+            yield generate_rows(count, language, batch_seed)
+        return
+
+    # najwyżej 2 paczki na proces czekają w pamięci na zapis do bazy
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for count, batch_seed in _batches(n, batch_size, seed):
+            pending.append(executor.submit(generate_rows, count, language, batch_seed))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def generate_posts(n, language="pl_PL", batch_size=1000, workers=1, seed=None):
+    """
+    Tworzy n postów przez bulk_create w paczkach po batch_size.
+
+    Teksty z Fakera mogą być generowane w workers procesach. Przy podanym seed
+    wynik jest powtarzalny (niezależnie od liczby procesów).
+    Zwraca (liczba postów, czas w sekundach).
+    """
+    author_ids = list(User.objects.values_list("id", flat=True))
+    if not author_ids:
+        raise ValueError("No users to use as post authors")
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    created = 0
+
+    for rows in _generated_batches(n, batch_size, language, workers, seed):
+        now = timezone.now()
+        posts = [
+            Post(
+                title=title,
+                slug=slugify(title),
+                content=content,
+                author_id=rng.choice(author_ids),
+                status=status,
+                # bulk_create nie woła Post.save()
+                posted_at=now if status == "published" else None,
+            )
+            for title, content, status in rows
+        ]
+        Post.objects.bulk_create(posts, batch_size=batch_size)
+        created += len(posts)
+
+    return created, time.perf_counter() - start
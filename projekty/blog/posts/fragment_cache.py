@@ -0,0 +1,76 @@
+"""
+Cache wyrenderowanych fragmentów strony posta (posts:details).
+
+Osobno trzymamy wariant dla czytelnika (treść posta) i dla autora (formularz
+edycji - bez {% csrf_token %}, ten renderujemy przy każdym żądaniu).
+Wpis pamięta updated_at posta, więc zmiana posta - także przez queryset.update()
+z aktualizacją updated_at - oznacza chybienie. Dodatkowo sygnały
+(posts.signals) kasują wpisy po zapisie i usunięciu posta.
+
+Backend wybieramy w settings.CACHES (alias POSTS_CACHE_ALIAS): locmem / plik
+lokalnie, Redis na produkcji. Liczniki trafień i czasu renderowania są
+w tym samym cache - metrics() zwraca je np. dla widoku posts:cache_metrics.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+
+VARIANTS = ("reader", "author")
+METRICS = ("hits", "misses", "render_us")
+
+
+def _cache():
+    return caches[getattr(settings, "POSTS_CACHE_ALIAS", "default")]
+
+
+def _key(post_id, variant):
+    return f"posts:details:{post_id}:{variant}"
+
+
+def _incr(name, delta=1):
+    cache = _cache()
+    key = f"posts:details:metrics:{name}"
+    if not cache.add(key, delta, timeout=None):
+        cache.incr(key, delta)
+
+
+def get_or_render(post, variant, render):
+    """
+    Zwraca (html, trafienie). render() wywoływane jest tylko przy chybieniu.
+    """
+    cache = _cache()
+    key = _key(post.pk, variant)
+    stamp = post.updated_at.isoformat()
+
+    cached = cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        _incr("hits")
+        return mark_safe(cached[1]), True
+
+    start = time.perf_counter()
+    html = str(render())
+    elapsed_us = int((time.perf_counter() - start) * 1_000_000)
+
+    cache.set(key, (stamp, html), getattr(settings, "POSTS_FRAGMENT_CACHE_TIMEOUT", 3600))
+    _incr("misses")
+    _incr("render_us", elapsed_us)
+    return mark_safe(html), False
+
+
+def invalidate(post_id):
+    _cache().delete_many([_key(post_id, variant) for variant in VARIANTS])
+
+
+def metrics():
+    cache = _cache()
+    values = cache.get_many([f"posts:details:metrics:{name}" for name in METRICS])
+    hits, misses, render_us = (values.get(f"posts:details:metrics:{name}", 0) for name in METRICS)
+    requests = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / requests if requests else None,
+        "avg_render_ms": render_us / misses / 1000 if misses else None,
+    }
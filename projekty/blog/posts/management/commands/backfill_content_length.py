@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Uzupełnia Post.content_length dla istniejących wierszy (w paczkach po id)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000, help="Liczba wierszy w jednym UPDATE")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        updated = 0
+
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            updated += (
+                Post.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+                .exclude(content_length=Length("content"))
+                .update(content_length=Length("content"))
+            )
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Updated content_length for {updated} posts"))
@@ -0,0 +1,68 @@
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje stary filtr opłacalności (price > production_cost) z kolumną "
+        "is_profitable. Dane testowe są wycofywane (rollback) po pomiarze."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Liczba postów testowych")
+        parser.add_argument("--repeat", type=int, default=5, help="Liczba powtórzeń pomiaru")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["rows"], options["batch_size"], options["seed"])
+
+            querysets = {
+                "old: price > production_cost": Post.objects.filter(price__gt=F("production_cost")),
+                "new: is_profitable (index)": Post.objects.profitable(),
+            }
+            for name, queryset in querysets.items():
+                count = self.measure(lambda: queryset.count(), options["repeat"])
+                page = self.measure(lambda: list(queryset.order_by("-margin")[:100]), options["repeat"])
+                self.stdout.write(f"{name}")
+                self.stdout.write(f"  count():               {count * 1000:8.1f} ms")
+                self.stdout.write(f"  top 100 by margin:     {page * 1000:8.1f} ms")
+                self.stdout.write(f"  plan: {queryset.explain()}")
+
+            transaction.set_rollback(True)
+
+    def seed(self, rows, batch_size, seed):
+        rng = random.Random(seed)
+        author, _ = User.objects.get_or_create(username="benchmark_profitability")
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            Post.objects.bulk_create(
+                Post(
+                    title="benchmark",
+                    slug="benchmark",
+                    content="",
+                    author=author,
+                    price=Decimal(rng.randint(0, 20000)) / 100,
+                    production_cost=Decimal(rng.randint(0, 20000)) / 100,
+                )
+                for _ in range(min(batch_size, rows - offset))
+            )
+        self.stdout.write(f"Seeded {rows} posts in {time.perf_counter() - start:.1f}s")
+
+    def measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
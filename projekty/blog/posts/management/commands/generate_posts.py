@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.data_generator import generate_posts
+
+
+class Command(BaseCommand):
+    help = "Generuje losowe posty (bulk_create, opcjonalnie w kilku procesach)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000, help="Liczba postów do wygenerowania")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Liczba postów w jednym bulk_create")
+        parser.add_argument("--workers", type=int, default=1, help="Liczba procesów generujących teksty")
+        parser.add_argument("--seed", type=int, default=None, help="Ziarno losowości (powtarzalne dane)")
+        parser.add_argument("--language", default="pl_PL", help="Lokalizacja Fakera")
+
+    def handle(self, *args, **options):
+        if options["count"] < 1 or options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--count, --batch-size and --workers must be positive")
+
+        try:
+            created, elapsed = generate_posts(
+                options["count"],
+                language=options["language"],
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Generated {created} posts in {elapsed:.1f}s ({rate:.0f} rows/s)"))
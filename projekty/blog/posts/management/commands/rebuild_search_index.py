@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = "Tworzy i przebudowuje indeks pełnotekstowy postów"
+
+    def handle(self, *args, **options):
+        search.install()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0008_post_price_post_production_cost"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "posted_at", "id"], name="post_status_posted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0009_post_status_posted_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", "published")),
+                fields=["posted_at", "id"],
+                name="post_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "status", "posted_at", "id"],
+                name="post_author_status_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0010_post_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="content_length",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
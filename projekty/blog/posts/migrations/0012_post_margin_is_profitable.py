@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:32
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0011_post_content_length"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="is_profitable",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Q(("price__gt", models.F("production_cost"))),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="margin",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.CombinedExpression(
+                    models.F("price"), "-", models.F("production_cost")
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=11),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["is_profitable", "margin"], name="post_profitable_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from posts import search
+
+
+def install_search_index(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0013_bulkactionjob"),
+    ]
+
+    operations = [
+        # sqlite: tabela FTS5 + triggery, postgres: kolumna tsvector + indeks GIN
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
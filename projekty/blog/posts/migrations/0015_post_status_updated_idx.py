@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0014_post_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "updated_at"], name="post_status_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:48
+
+import images.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0015_post_status_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=images.storage.content_storage,
+                upload_to="posts/%Y/%m/%d/",
+            ),
+        ),
+    ]
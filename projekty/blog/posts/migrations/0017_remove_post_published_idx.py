@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0016_alter_post_image"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_published_idx",
+        ),
+    ]
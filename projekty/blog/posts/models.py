@@ -1,5 +1,54 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Length
 from django.utils import timezone
+
+from images.storage import content_storage
+
+
+class PostQuerySet(models.QuerySet):
+    """
+    Pilnuje pól wyliczanych z innych pól (content_length) także w operacjach
+    masowych, które omijają Post.save().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.content_length = len(obj.content)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if "content" in fields:
+            for obj in objs:
+                obj.content_length = len(obj.content)
+            fields = [*fields, "content_length"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if "content" in kwargs and "content_length" not in kwargs:
+            content = kwargs["content"]
+            kwargs["content_length"] = len(content) if isinstance(content, str) else Length(content)
+        return super().update(**kwargs)
+
+    def publish(self):
+        # odpowiednik Post.save() dla wielu wierszy: posted_at tylko tam, gdzie go brak
+        now = timezone.now()
+        return self.update(
+            status="published",
+            posted_at=Coalesce("posted_at", models.Value(now)),
+            updated_at=now,
+        )
+
+    def unpublish(self):
+        return self.update(status="draft", updated_at=timezone.now())
+
+    def profitable(self, value=True):
+        # filter(is_profitable=True) Django zamienia na "WHERE is_profitable",
+        # czego sqlite nie potrafi dopasować do indeksu - IN (1) już tak
+        return self.filter(is_profitable__in=[value])
+
+
 # Create your models here.
 class Post(models.Model):
 
@@ -12,17 +61,55 @@ class Post(models.Model):
     slug = models.SlugField(max_length=255)
     author = models.ForeignKey("auth.User", on_delete=models.CASCADE)
     content = models.TextField()
+    # len(content) - liczone w save() i PostQuerySet, stare wiersze uzupełnia
+    # python manage.py backfill_content_length
+    content_length = models.PositiveIntegerField(default=0, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     status = models.CharField(choices=STATUS_CHOICES, default="draft", max_length=10)
     posted_at = models.DateTimeField(blank=True, null=True)
 
-    image = models.ImageField(upload_to="posts/%Y/%m/%d/", null=True, blank=True)
+    image = models.ImageField(upload_to="posts/%Y/%m/%d/", storage=content_storage, null=True, blank=True)
 
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     production_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    # kolumny wyliczane przez bazę (GENERATED ... STORED) - zawsze aktualne,
+    # również po queryset.update() i akcjach admina. Po save() wartość na
+    # obiekcie odświeża dopiero refresh_from_db().
+    margin = models.GeneratedField(
+        expression=models.F("price") - models.F("production_cost"),
+        output_field=models.DecimalField(max_digits=11, decimal_places=2),
+        db_persist=True,
+    )
+    is_profitable = models.GeneratedField(
+        expression=models.Q(price__gt=models.F("production_cost")),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        # zapytania korzystające z indeksów sprawdza posts.tests.QueryPlanTests
+        indexes = [
+            # filtr po statusie (widoki, admin, API) z sortowaniem po posted_at,
+            # także lista opublikowanych (paginacja kursorowa - posts.pagination).
+            # Zastępuje częściowy indeks (posted_at, id) WHERE status='published'
+            # (usunięty w 0017): przy status = 'published' w zapytaniu ten indeks daje
+            # ten sam plan (status=? AND posted_at<?, bez sortowania), planer wybierał go
+            # mimo obecności częściowego, a częściowy kosztował osobny zapis przy każdej
+            # zmianie posta. Ten sam indeks obsługuje szkice w adminie.
+            models.Index(fields=["status", "posted_at", "id"], name="post_status_posted_idx"),
+            # posty autora (API ?author=, admin), opcjonalnie z filtrem po statusie
+            models.Index(fields=["author", "status", "posted_at", "id"], name="post_author_status_idx"),
+            # filtr "Is profitable" w adminie i raporty sortowane po marży
+            models.Index(fields=["is_profitable", "margin"], name="post_profitable_idx"),
+            # ETag listy: MAX(updated_at), COUNT(*) - posts.conditional
+            models.Index(fields=["status", "updated_at"], name="post_status_updated_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -30,8 +117,44 @@ class Post(models.Model):
     def save(self, *args, **kwargs):
         if self.status == "published" and not self.posted_at:
             self.posted_at = timezone.now()
+        self.content_length = len(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_length"}
         super().save(*args, **kwargs)
 
 
     def get_short_content(self):
-        return self.content[:50] + "..." if len(self.content) > 50 else self.content
\ No newline at end of file
+        return self.content[:50] + "..." if len(self.content) > 50 else self.content
+
+
+class BulkActionJob(models.Model):
+    """
+    Masowa akcja z panelu admina wykonywana w tle (posts.bulk_actions).
+    processed / total pokazują postęp w adminie.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    action = models.CharField(max_length=50)
+    status = models.CharField(choices=STATUS_CHOICES, default="queued", max_length=10)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey("auth.User", on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.action} #{self.pk}"
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 100 if self.status == "done" else 0
+        return round(100 * self.processed / self.total)
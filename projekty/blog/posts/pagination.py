@@ -0,0 +1,188 @@
+"""
+Paginacja kursorowa (keyset pagination) dla listy postów.
+
+Zamiast OFFSET/LIMIT i COUNT(*) (django.core.paginator.Paginator) zapamiętujemy
+klucz ostatniego wyświetlonego wiersza - parę (posted_at, id) - i następną stronę
+pobieramy warunkiem WHERE (posted_at, id) < (klucz). Dzięki indeksowi
+(status, posted_at, id) koszt pobrania strony nie zależy od tego jak "głęboko"
+jesteśmy.
+
+Kursor jest nieprzezroczystym tokenem (base64 z JSON-a), więc klient nie musi
+wiedzieć jak jest zbudowany.
+
+paginator = KeysetPaginator(Post.objects.filter(status="published"), per_page=50)
+page = paginator.page(request.GET.get("cursor"))
+page.next_cursor, page.previous_cursor
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(posted_at, pk, direction="next"):
+    data = {
+        "p": posted_at.isoformat() if posted_at else None,
+        "i": pk,
+        "d": direction,
+    }
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        posted_at = datetime.fromisoformat(data["p"]) if data["p"] else None
+        pk = int(data["i"])
+        direction = data["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+    if direction not in ("next", "prev"):
+        raise InvalidCursor("Invalid cursor")
+    return posted_at, pk, direction
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(last.posted_at, last.pk, "next")
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        first = self.object_list[0]
+        return encode_cursor(first.posted_at, first.pk, "prev")
+
+
+class KeysetPaginator:
+    """
+    Paginator stronicujący od najnowszych postów: ORDER BY posted_at DESC, id DESC.
+
+    Posty bez posted_at (NULL) są na końcu listy.
+    with_count=False pomija COUNT(*) - count jest wtedy None.
+    """
+
+    def __init__(self, queryset, per_page=50, with_count=False, max_per_page=100):
+        self.queryset = queryset
+        self.per_page = max(1, min(int(per_page), max_per_page))
+        self.with_count = with_count
+
+    @property
+    def count(self):
+        if not self.with_count:
+            return None
+        if not hasattr(self, "_count"):
+            self._count = self.queryset.count()
+        return self._count
+
+    # Lista dzieli się na dwa segmenty: posty z posted_at (od najnowszych)
+    # i na końcu posty bez posted_at (od najwyższego id). Każdy segment to osobne
+    # zapytanie z prostym warunkiem zakresowym - warunek "OR posted_at IS NULL"
+    # uniemożliwiłby bazie przeszukanie indeksu od klucza kursora.
+    DATED = Q(posted_at__isnull=False)
+    UNDATED = Q(posted_at__isnull=True)
+
+    def _segments(self, posted_at=None, pk=None, direction="next"):
+        """Zwraca listę par (warunek, sortowanie) do odpytania po kolei."""
+        forward_dated = ("-posted_at", "-id")
+        forward_undated = ("-id",)
+        backward_dated = ("posted_at", "id")
+        backward_undated = ("id",)
+
+        if pk is None:
+            return [(self.DATED, forward_dated), (self.UNDATED, forward_undated)]
+
+        if direction == "next":
+            if posted_at is None:
+                return [(self.UNDATED & Q(id__lt=pk), forward_undated)]
+            after = Q(posted_at__lte=posted_at) & (Q(posted_at__lt=posted_at) | Q(id__lt=pk))
+            return [(after, forward_dated), (self.UNDATED, forward_undated)]
+
+        if posted_at is None:
+            return [(self.UNDATED & Q(id__gt=pk), backward_undated), (self.DATED, backward_dated)]
+        before = Q(posted_at__gte=posted_at) & (Q(posted_at__gt=posted_at) | Q(id__gt=pk))
+        return [(before, backward_dated)]
+
+    def _fetch(self, segments, limit, fields=None, chunk_size=None):
+        for condition, ordering in segments:
+            if limit <= 0:
+                return
+            qs = self.queryset.filter(condition).order_by(*ordering)
+            if fields:
+                qs = qs.values(*fields)
+            qs = qs[:limit]
+            rows = qs.iterator(chunk_size=chunk_size) if chunk_size else qs
+            for row in rows:
+                limit -= 1
+                yield row
+
+    def iterator(self, cursor=None, limit=None, fields=None, chunk_size=2000):
+        """
+        Wiersze od kursora w przód, pobierane strumieniowo przez .iterator()
+        (np. dla API). fields przekazywane są do .values().
+        """
+        if limit is None:
+            limit = self.per_page
+        if cursor:
+            posted_at, pk, direction = decode_cursor(cursor)
+            if direction != "next":
+                raise InvalidCursor("Invalid cursor")
+            segments = self._segments(posted_at, pk)
+        else:
+            segments = self._segments()
+        return self._fetch(segments, limit, fields, chunk_size)
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self._fetch(self._segments(), self.per_page + 1))
+            has_next = len(rows) > self.per_page
+            return KeysetPage(rows[: self.per_page], self, has_next, False)
+
+        posted_at, pk, direction = decode_cursor(cursor)
+        rows = list(self._fetch(self._segments(posted_at, pk, direction), self.per_page + 1))
+
+        if direction == "next":
+            has_next = len(rows) > self.per_page
+            return KeysetPage(rows[: self.per_page], self, has_next, True)
+
+        if not rows:
+            return self.page()
+        has_previous = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        rows.reverse()
+        return KeysetPage(rows, self, True, has_previous)
@@ -0,0 +1,226 @@
+"""
+Wyszukiwanie pełnotekstowe postów.
+
+search_fields = ("title", "content") w adminie to LIKE '%fraza%' - pełny skan
+tabeli przy każdym wyszukiwaniu. Tutaj korzystamy z indeksu pełnotekstowego:
+
+- sqlite: tabela FTS5 posts_post_fts (external content) + triggery na posts_post,
+- postgres: kolumna tsvector (GENERATED ... STORED) + indeks GIN,
+- inne bazy: awaryjnie icontains.
+
+Indeks aktualizuje sama baza (triggery / kolumna wyliczana), więc działa to
+także dla bulk_create, queryset.update() i delete().
+
+search_posts("django orm", Post.objects.filter(status="published"))
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+
+SEARCH_LIMIT = 1000
+
+SQLITE_TRIGGERS = {
+    "posts_post_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai AFTER INSERT ON posts_post BEGIN
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+    "posts_post_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad AFTER DELETE ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+    """,
+    "posts_post_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_au AFTER UPDATE OF title, content ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+}
+
+POSTGRES_INSTALL = [
+    """
+    ALTER TABLE posts_post ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS posts_post_search_idx ON posts_post USING GIN (search_vector)",
+]
+
+
+def _tokens(query):
+    return re.findall(r"\w+", query.lower())
+
+
+class SqliteSearchBackend:
+    def _existing(self, cursor):
+        names = ["posts_post_fts", *SQLITE_TRIGGERS]
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s)" % ", ".join(["%s"] * len(names)),
+            names,
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    def install(self, cursor):
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+            "title, content, content='posts_post', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        self.rebuild(cursor)
+
+    def repair(self, cursor):
+        # triggery znikają razem z tabelą, gdy migracja sqlite przebudowuje
+        # posts_post (np. AlterField) - odtwarzamy je i przebudowujemy indeks
+        existing = self._existing(cursor)
+        if "posts_post_fts" in existing and existing != {"posts_post_fts", *SQLITE_TRIGGERS}:
+            self.install(cursor)
+
+    def uninstall(self, cursor):
+        for name in SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute("DROP TABLE IF EXISTS posts_post_fts")
+
+    def rebuild(self, cursor):
+        cursor.execute("INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')")
+
+    def ranked_ids(self, cursor, query, limit, restrict=None):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        # każde słowo w cudzysłowie (bez składni FTS5 od użytkownika), ostatnie jako prefiks
+        match = " ".join(f'"{token}"' for token in tokens) + "*"
+        where, params = _restriction("rowid", restrict)
+        cursor.execute(
+            "SELECT rowid, -bm25(posts_post_fts, 10.0, 1.0) AS rank FROM posts_post_fts "
+            f"WHERE posts_post_fts MATCH %s{where} ORDER BY rank DESC LIMIT %s",
+            [match, *params, limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgresSearchBackend:
+    def install(self, cursor):
+        for sql in POSTGRES_INSTALL:
+            cursor.execute(sql)
+
+    def repair(self, cursor):
+        pass
+
+    def uninstall(self, cursor):
+        cursor.execute("DROP INDEX IF EXISTS posts_post_search_idx")
+        cursor.execute("ALTER TABLE posts_post DROP COLUMN IF EXISTS search_vector")
+
+    def rebuild(self, cursor):
+        # kolumna GENERATED jest zawsze aktualna
+        pass
+
+    def ranked_ids(self, cursor, query, limit, restrict=None):
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+        tsquery = " & ".join(tokens) + ":*"
+        where, params = _restriction("id", restrict)
+        cursor.execute(
+            "SELECT id, ts_rank(search_vector, q) AS rank "
+            "FROM posts_post, to_tsquery('simple', %s) q "
+            f"WHERE search_vector @@ q{where} ORDER BY rank DESC LIMIT %s",
+            [tsquery, *params, limit],
+        )
+        return cursor.fetchall()
+
+
+class FallbackSearchBackend:
+    def install(self, cursor):
+        pass
+
+    def repair(self, cursor):
+        pass
+
+    def uninstall(self, cursor):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def ranked_ids(self, cursor, query, limit, restrict=None):
+        from .models import Post
+
+        condition = Q()
+        for token in _tokens(query):
+            condition &= Q(title__icontains=token) | Q(content__icontains=token)
+        queryset = Post.objects.all() if restrict is None else restrict
+        ids = queryset.filter(condition).order_by().values_list("id", flat=True)[:limit]
+        return [(pk, 0.0) for pk in ids]
+
+
+def _restriction(column, queryset):
+    """
+    Warunek "AND <column> IN (SELECT id FROM ...)" z querysetu - filtr (np. tylko
+    opublikowane) działa przed LIMIT, a nie na już obciętych wynikach.
+    """
+    if queryset is None:
+        return "", []
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    return f" AND {column} IN ({sql})", list(params)
+
+
+def get_backend(conn=None):
+    vendor = (conn or connection).vendor
+    if vendor == "sqlite":
+        return SqliteSearchBackend()
+    if vendor == "postgresql":
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
+
+
+def install(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        get_backend(conn).install(cursor)
+
+
+def repair(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        get_backend(conn).repair(cursor)
+
+
+def uninstall(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        get_backend(conn).uninstall(cursor)
+
+
+def search_posts(query, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Posty pasujące do frazy, posortowane od najlepiej dopasowanych.
+    Ranking (search_rank) jest liczony dla najlepszych `limit` wyników
+    spośród postów z queryset.
+    """
+    from .models import Post
+
+    restrict = queryset
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    with connection.cursor() as cursor:
+        ranked = get_backend().ranked_ids(cursor, query, limit, restrict)
+
+    if not ranked:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+    return (
+        queryset.filter(pk__in=[pk for pk, _ in ranked])
+        .annotate(search_rank=Case(
+            *[When(pk=pk, then=Value(float(rank))) for pk, rank in ranked],
+            output_field=FloatField(),
+        ))
+        .order_by("-search_rank", "-pk")
+    )
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from images import variants
+from images.models import ImageVariant
+from images.signals import variants_generated
+
+from . import fragment_cache
+from .models import Post
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_fragments(sender, instance, **kwargs):
+    fragment_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    if update_fields is None or "image" in update_fields:
+        variants.schedule(instance.image.name)
+
+
+@receiver(variants_generated, sender=ImageVariant)
+def refresh_posts_with_image(sender, source, **kwargs):
+    # nowy updated_at = chybienie w fragment_cache i nowy ETag strony posta
+    Post.objects.filter(image=source).update(updated_at=timezone.now())
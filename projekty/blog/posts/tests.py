@@ -1,2 +1,476 @@
+import io
+import json
+import time
+from datetime import timedelta
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.test.signals import template_rendered
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .data_generator import generate_rows
+from .bulk_actions import run_job
+from .models import BulkActionJob, Post
+from .search import search_posts
+from .pagination import KeysetPaginator, InvalidCursor, decode_cursor, encode_cursor
+from .views import SEARCH_RESULTS
 # Create your tests here.
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user("author", password="secret")
+        now = timezone.now()
+        for i in range(7):
+            Post.objects.create(
+                title=f"Post {i}", content="x", author=self.author,
+                status="published", posted_at=now - timedelta(minutes=i // 2),
+            )
+
+    def test_walk_forward_and_back(self):
+        paginator = KeysetPaginator(Post.objects.filter(status="published"), per_page=3)
+        expected = list(Post.objects.order_by("-posted_at", "-id"))
+
+        page1 = paginator.page()
+        page2 = paginator.page(page1.next_cursor)
+        page3 = paginator.page(page2.next_cursor)
+        self.assertEqual(list(page1) + list(page2) + list(page3), expected)
+        self.assertFalse(page3.has_next())
+
+        back = paginator.page(page3.previous_cursor)
+        self.assertEqual(list(back), list(page2))
+        self.assertTrue(back.has_previous())
+
+    def test_count_is_optional(self):
+        posts = Post.objects.filter(status="published")
+        self.assertIsNone(KeysetPaginator(posts).count)
+        self.assertEqual(KeysetPaginator(posts, with_count=True).count, 7)
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(Post.objects.all())
+        with self.assertRaises(InvalidCursor):
+            paginator.page("not-a-cursor")
+
+    def test_list_view(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse("posts:list"), {"per_page": 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page_obj"]), 3)
+
+        response = self.client.get(reverse("posts:list"), {"cursor": "xxx"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostsApiTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user("author", password="secret")
+        self.other = User.objects.create_user("other", password="secret")
+        for i in range(5):
+            Post.objects.create(title=f"Post {i}", content="x" * 100, author=self.author, status="published")
+        Post.objects.create(title="Draft", content="x", author=self.other)
+
+    def get_json(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_v1_keeps_serializer_format(self):
+        data = self.get_json(reverse("posts:posts_list_api"))
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[0]["model"], "posts.post")
+
+    def test_v2_fields_filters_and_cursor(self):
+        url = reverse("posts:posts_list_api_v2")
+        params = {"fields": "id,title", "status": "published", "author": self.author.id, "limit": 3}
+
+        page1 = self.get_json(url, params)
+        self.assertEqual(len(page1["results"]), 3)
+        self.assertEqual(set(page1["results"][0]), {"id", "title"})
+
+        page2 = self.get_json(url, {**params, "cursor": page1["next"]})
+        self.assertEqual(len(page2["results"]), 2)
+        self.assertIsNone(page2["next"])
+
+        ids = [item["id"] for item in page1["results"] + page2["results"]]
+        self.assertEqual(sorted(ids), sorted(Post.objects.filter(status="published").values_list("id", flat=True)))
+
+    def test_v2_rejects_unknown_field(self):
+        response = self.client.get(reverse("posts:posts_list_api_v2"), {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN dla "gorących" zapytań na zaseedowanej bazie.
+    Test nie przechodzi, jeżeli któreś zapytanie czyta całą tabelę posts_post.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [User.objects.create_user(f"author{i}") for i in range(10)]
+        now = timezone.now()
+        Post.objects.bulk_create(
+            Post(
+                title=f"Post {i}", content="x" * (i % 300), author=authors[i % 10],
+                status="published" if i % 4 else "draft",
+                posted_at=now - timedelta(minutes=i) if i % 4 else None,
+                price=i % 50, production_cost=40,
+            )
+            for i in range(2000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.author = authors[0]
+        cls.cursor_post = Post.objects.filter(status="published").order_by("-posted_at", "-id")[1000]
+
+    def assertUsesIndex(self, querysets, index=None):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+        for queryset in querysets:
+            self.assertPlanUsesIndex(queryset.explain(), queryset.query, index)
+
+    def assertPlanUsesIndex(self, plan, query, index=None):
+        if connection.vendor == "sqlite":
+            self.assertNotRegex(plan, r"SCAN posts_post\b", msg=f"{query}\n{plan}")
+        elif connection.vendor == "postgresql":
+            self.assertNotIn("Seq Scan on posts_post", plan, msg=f"{query}\n{plan}")
+        if index:
+            self.assertIn(index, plan, msg=f"{query}\n{plan}")
+
+    def count_plan(self, queryset):
+        # queryset.count() nie ma explain() - EXPLAIN dokładnie tego SELECT COUNT(*), który wykonał
+        with CaptureQueriesContext(connection) as queries:
+            queryset.count()
+        sql = queries[-1]["sql"]
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            plan = "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+        return plan, sql
+
+    def keyset_querysets(self, queryset, cursor=None):
+        # każdy segment paginacji to osobne zapytanie - sprawdzamy wszystkie
+        paginator = KeysetPaginator(queryset, per_page=50)
+        segments = paginator._segments(*decode_cursor(cursor)) if cursor else paginator._segments()
+        return [queryset.filter(condition).order_by(*ordering)[:51] for condition, ordering in segments]
+
+    def test_posts_list_pages(self):
+        # lista opublikowanych korzysta z indeksu złożonego - częściowy (status='published') nie jest potrzebny
+        published = Post.objects.filter(status="published")
+        post = self.cursor_post
+        cursors = [None, encode_cursor(post.posted_at, post.id, "next"), encode_cursor(post.posted_at, post.id, "prev")]
+        for cursor in cursors:
+            self.assertUsesIndex(self.keyset_querysets(published, cursor), index="post_status_posted_idx")
+
+    def test_published_count(self):
+        plan, sql = self.count_plan(Post.objects.filter(status="published"))
+        self.assertIn("COUNT(*)", sql)
+        self.assertPlanUsesIndex(plan, sql)
+
+    def test_posts_by_author(self):
+        by_author = Post.objects.filter(author=self.author)
+        self.assertUsesIndex([by_author, by_author.filter(status="draft")])
+        self.assertUsesIndex(self.keyset_querysets(by_author.filter(status="published")))
+
+    def test_admin_status_filter(self):
+        self.assertUsesIndex([Post.objects.filter(status="draft").order_by("-posted_at", "-id")])
+
+    def test_admin_content_length_filter(self):
+        self.assertUsesIndex([
+            Post.objects.filter(content_length__lt=15),
+            Post.objects.filter(content_length__gte=15, content_length__lt=20),
+        ])
+
+    def test_admin_is_profitable_filter(self):
+        self.assertUsesIndex([
+            Post.objects.profitable(),
+            Post.objects.profitable(False).order_by("-margin"),
+        ])
+
+    def test_post_details(self):
+        self.assertUsesIndex([Post.objects.filter(id=self.cursor_post.id, status="published")])
+
+    def test_conditional_get_state(self):
+        self.assertUsesIndex([Post.objects.filter(status="published").values("updated_at")])
+
+
+
+class GeneratePostsCommandTests(TestCase):
+    def test_generates_posts_in_bulk(self):
+        User.objects.create_user("author")
+        out = io.StringIO()
+        call_command("generate_posts", count=25, batch_size=10, workers=2, seed=1, stdout=out)
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertIn("Generated 25 posts", out.getvalue())
+        self.assertFalse(Post.objects.filter(status="published", posted_at__isnull=True).exists())
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(generate_rows(5, seed=7), generate_rows(5, seed=7))
+
+
+class ContentLengthTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user("author")
+
+    def test_kept_up_to_date(self):
+        post = Post.objects.create(title="a", content="12345", author=self.author)
+        self.assertEqual(post.content_length, 5)
+
+        post.content = "123"
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        self.assertEqual(post.content_length, 3)
+
+        Post.objects.filter(id=post.id).update(content="1234567")
+        post.refresh_from_db()
+        self.assertEqual(post.content_length, 7)
+
+        Post.objects.bulk_create([Post(title="b", content="12", author=self.author)])
+        self.assertEqual(Post.objects.get(title="b").content_length, 2)
+
+    def test_backfill_command(self):
+        post = Post.objects.create(title="a", content="12345", author=self.author)
+        Post.objects.filter(id=post.id).update(content_length=0)
+
+        call_command("backfill_content_length", batch_size=1, stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.content_length, 5)
+
+
+class ProfitabilityTests(TestCase):
+    def test_generated_columns_follow_updates(self):
+        author = User.objects.create_user("author")
+        post = Post.objects.create(title="a", content="x", author=author, price=10, production_cost=4)
+        post.refresh_from_db()
+        self.assertEqual(post.margin, 6)
+        self.assertTrue(post.is_profitable)
+
+        Post.objects.filter(id=post.id).update(production_cost=12)
+        self.assertFalse(Post.objects.profitable().exists())
+        self.assertEqual(Post.objects.profitable(False).get().margin, -2)
+
+
+@override_settings(BULK_ACTIONS_ASYNC=False)
+class BulkAdminActionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        Post.objects.bulk_create(Post(title=f"Post {i}", content="x", author=self.admin) for i in range(25))
+        self.client.force_login(self.admin)
+
+    def test_mark_as_published_sets_posted_at(self):
+        response = self.client.post(reverse("admin:posts_post_changelist"), {
+            "action": "mark_as_published",
+            "select_across": "1",
+            "index": "0",
+            "_selected_action": Post.objects.values_list("id", flat=True)[:1],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Post.objects.exclude(status="published").exists())
+        self.assertFalse(Post.objects.filter(posted_at__isnull=True).exists())
+
+        job = BulkActionJob.objects.get()
+        self.assertEqual((job.status, job.total, job.processed), ("done", 25, 25))
+
+    def test_chunks_keep_existing_posted_at(self):
+        first = Post.objects.order_by("pk").first()
+        posted_at = timezone.now() - timedelta(days=1)
+        Post.objects.filter(pk=first.pk).update(posted_at=posted_at)
+
+        job = BulkActionJob.objects.create(action="mark_as_published")
+        run_job(job.pk, Post.objects.all(), chunk_size=10)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), ("done", 25))
+        first.refresh_from_db()
+        self.assertEqual(first.posted_at, posted_at)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        self.django = Post.objects.create(
+            title="Django ORM", content="Zapytania w Django", author=self.author, status="published",
+        )
+        self.flask = Post.objects.create(
+            title="Flask", content="Też wspomina o django", author=self.author, status="published",
+        )
+
+    def test_ranked_by_relevance(self):
+        self.assertEqual(list(search_posts("django")), [self.django, self.flask])
+        self.assertEqual(list(search_posts("zapyt")), [self.django])
+        self.assertEqual(list(search_posts('" * (')), [])
+
+    def test_index_follows_changes(self):
+        self.flask.title = "Pyramid"
+        self.flask.content = "Inny framework"
+        self.flask.save()
+        Post.objects.bulk_create([Post(title="FastAPI", content="async", author=self.author)])
+        self.django.delete()
+
+        self.assertEqual(list(search_posts("django")), [])
+        self.assertEqual(list(search_posts("pyramid")), [self.flask])
+        self.assertEqual(search_posts("fastapi").get().title, "FastAPI")
+
+    def test_queryset_filter_applied_before_limit(self):
+        # szkice lepiej pasują do frazy i jest ich więcej niż limit widoku wyszukiwania
+        Post.objects.bulk_create([
+            Post(title=f"Django django {i}", content="django django", author=self.author, status="draft")
+            for i in range(SEARCH_RESULTS + 5)
+        ])
+        published = Post.objects.filter(status="published")
+
+        self.assertEqual(list(search_posts("django", published, limit=2)), [self.django, self.flask])
+        self.assertEqual(list(search_posts("django", published, limit=1)), [self.django])
+
+        self.client.force_login(self.author)
+        response = self.client.get(reverse("posts:search"), {"q": "django"})
+        self.assertContains(response, "Django ORM")
+
+    def test_admin_and_search_view(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse("admin:posts_post_changelist"), {"q": "django"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.django, self.flask])
+
+        response = self.client.get(reverse("admin:posts_post_changelist"), {"q": "nothing"})
+        self.assertEqual(response.context["cl"].result_count, 0)
+
+        response = self.client.get(reverse("posts:search"), {"q": "orm"})
+        self.assertContains(response, "Django ORM")
+
+
+class PostDetailsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user("author", password="secret")
+        self.reader = User.objects.create_user("reader", password="secret", is_staff=True)
+        self.post = Post.objects.create(title="Cached", content="Treść", author=self.author, status="published")
+        self.url = reverse("posts:details", args=[self.post.id])
+
+    def test_reader_hit_after_miss(self):
+        self.client.force_login(self.reader)
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Fragment-Cache"], "miss")
+
+        with self.assertNumQueries(4):  # sesja, użytkownik, updated_at (ETag), post (bez autora i renderowania)
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Fragment-Cache"], "hit")
+        self.assertContains(second, "Treść")
+
+        metrics = self.client.get(reverse("posts:cache_metrics")).json()
+        self.assertEqual((metrics["hits"], metrics["misses"]), (1, 1))
+
+    def test_author_variant_and_invalidation(self):
+        self.client.force_login(self.reader)
+        self.client.get(self.url)
+
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Fragment-Cache"], "miss")
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+        self.client.post(self.url, {"title": "Cached", "content": "Nowa treść"})
+
+        self.client.force_login(self.reader)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Fragment-Cache"], "miss")
+        self.assertContains(response, "Nowa treść")
+
+    def test_bulk_update_is_a_miss(self):
+        self.client.force_login(self.reader)
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).unpublish()
+        Post.objects.filter(pk=self.post.pk).publish()
+        self.assertEqual(self.client.get(self.url)["X-Fragment-Cache"], "miss")
+
+    def test_reader_cannot_edit(self):
+        self.client.force_login(self.reader)
+        self.client.post(self.url, {"title": "Hacked", "content": "x"})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, "Cached")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader", password="secret")
+        self.post = Post.objects.create(title="Post", content="Treść", author=self.user, status="published")
+        self.client.force_login(self.user)
+        # pierwsze żądanie ustawia ciasteczko CSRF, które jest częścią ETag stron HTML
+        self.client.get(reverse("posts:list"))
+
+    def revalidate(self, url, response, params=None):
+        self.assertEqual(response.status_code, 200)
+        rendered = []
+        template_rendered.connect(lambda **kwargs: rendered.append(kwargs["template"]), weak=False, dispatch_uid="t")
+        try:
+            again = self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+        finally:
+            template_rendered.disconnect(dispatch_uid="t")
+        return again, rendered
+
+    def test_list_and_details_not_modified(self):
+        for url in [reverse("posts:list"), reverse("posts:details", args=[self.post.id])]:
+            again, rendered = self.revalidate(url, self.client.get(url))
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(rendered, [])
+
+    def test_change_invalidates_etag(self):
+        url = reverse("posts:list")
+        first = self.client.get(url)
+        Post.objects.create(title="Nowy", content="x", author=self.user, status="published")
+        again, _ = self.revalidate(url, first)
+        self.assertEqual(again.status_code, 200)
+        self.assertContains(again, "Nowy")
+
+        # bulk update() też zmienia updated_at
+        first = again
+        Post.objects.filter(pk=self.post.pk).unpublish()
+        self.assertEqual(self.revalidate(url, first)[0].status_code, 200)
+
+    def test_etag_depends_on_user_and_query(self):
+        url = reverse("posts:list")
+        first = self.client.get(url)
+        self.assertNotEqual(self.client.get(url, {"count": "1"})["ETag"], first["ETag"])
+
+        self.client.force_login(User.objects.create_user("other"))
+        self.assertEqual(self.revalidate(url, first)[0].status_code, 200)
+
+    def test_api_not_modified(self):
+        for name, params in [("posts:posts_list_api", None), ("posts:posts_list_api_v2", {"status": "published"})]:
+            url = reverse(name)
+            again, _ = self.revalidate(url, self.client.get(url, params), params)
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.content, b"")
+
+    def test_details_last_modified(self):
+        url = reverse("posts:details", args=[self.post.id])
+        first = self.client.get(url)
+        again = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_delete_of_older_post_invalidates_lists(self):
+        older = Post.objects.create(title="Starszy", content="x", author=self.user, status="published")
+        Post.objects.filter(pk=older.pk).update(updated_at=self.post.updated_at - timedelta(days=1))
+        since = http_date(time.time() + 60)
+        urls = [reverse("posts:list"), reverse("posts:posts_list_api"), reverse("posts:posts_list_api_v2")]
+        responses = [self.client.get(url) for url in urls]
+        for response in responses:
+            # MAX(updated_at) nie zauważy usunięcia starszego posta - listy nie mają Last-Modified
+            self.assertNotIn("Last-Modified", response)
+
+        older.delete()
+        for url, response in zip(urls, responses):
+            again = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(again.status_code, 200)
+            self.assertNotContains(again, "Starszy")
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+    def test_invalid_request_has_no_validators(self):
+        response = self.client.get(reverse("posts:posts_list_api_v2"), {"status": "nope"})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("ETag", response)
@@ -8,7 +8,10 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(), name="logout"),
     path("<int:post_id>/", views.post_details, name="details"),
     path("new/", views.post_create, name="create"),
+    path("search/", views.post_search, name="search"),
 
     path("api/v1/posts", views.posts_list_api, name="posts_list_api"),
+    path("api/v2/posts", views.posts_list_api_v2, name="posts_list_api_v2"),
+    path("api/v1/metrics/cache", views.cache_metrics, name="cache_metrics"),
 
 ]
@@ -4,41 +4,83 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from .forms import PostForm
-from django.core.paginator import Paginator
+from .pagination import KeysetPaginator, decode_cursor, encode_cursor
+from .search import search_posts
+from . import conditional, fragment_cache
+from django.contrib.admin.views.decorators import staff_member_required
+from django.template.loader import render_to_string
+from django.core.paginator import InvalidPage
 from django.core import serializers
-from django.http import HttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition
+import json
 # Create your views here.
 
 @login_required
+@condition(etag_func=conditional.posts_list_etag)
 def posts_list(request):
 
     posts = Post.objects.filter(status="published")
 
-    page_number = request.GET.get("page", 1)
+    cursor = request.GET.get("cursor")
     per_page = request.GET.get("per_page", 50)
-    paginator = Paginator(posts, per_page)
+    with_count = request.GET.get("count") == "1"
 
-    page_obj = paginator.page(page_number)
+    try:
+        paginator = KeysetPaginator(posts, per_page, with_count=with_count)
+        page_obj = paginator.page(cursor)
+    except (InvalidPage, ValueError):
+        raise Http404("Invalid page")
 
     return render(request, "posts/list.html", {"page_obj": page_obj})
 
+SEARCH_RESULTS = 50
+
+
 @login_required
+def post_search(request):
+    query = request.GET.get("q", "").strip()
+    posts = []
+    if query:
+        published = Post.objects.filter(status="published")
+        posts = search_posts(query, published, limit=SEARCH_RESULTS)
+    return render(request, "posts/search.html", {"query": query, "posts": posts})
+
+@login_required
+@condition(etag_func=conditional.post_details_etag, last_modified_func=conditional.post_details_last_modified)
 def post_details(request, post_id):
-    form = None
-    post = get_object_or_404(Post, id=post_id, status="published")
-    
-    if request.method == "POST":
-        form = PostForm(request.POST, instance=post)
-        if form.is_valid():
-            form.save()
-        
-    
-    if request.user == post.author:
-        form = PostForm(instance=post)
-        
-    
-    # post = Post.objects.get(id=post_id, status="published")
-    return render(request, "posts/details.html", {"post": post, "form": form})
+    # na start tylko pola potrzebne do klucza cache i sprawdzenia autora
+    post = get_object_or_404(
+        Post.objects.only("id", "author_id", "status", "updated_at"),
+        id=post_id, status="published",
+    )
+    is_author = request.user.id == post.author_id
+
+    if request.method == "POST" and is_author:
+        form = PostForm(request.POST, instance=Post.objects.get(pk=post.pk))
+        if not form.is_valid():
+            fragment = render_to_string("posts/_post_form.html", {"form": form})
+            return render(request, "posts/details.html", {"post": post, "fragment": fragment, "is_author": True})
+        post = form.save()
+
+    def render_fragment():
+        full_post = Post.objects.select_related("author").get(pk=post.pk)
+        if is_author:
+            return render_to_string("posts/_post_form.html", {"form": PostForm(instance=full_post)})
+        return render_to_string("posts/_post_body.html", {"post": full_post})
+
+    variant = "author" if is_author else "reader"
+    fragment, hit = fragment_cache.get_or_render(post, variant, render_fragment)
+
+    response = render(request, "posts/details.html", {"post": post, "fragment": fragment, "is_author": is_author})
+    response["X-Fragment-Cache"] = "hit" if hit else "miss"
+    return response
+
+
+@staff_member_required
+def cache_metrics(request):
+    return JsonResponse(fragment_cache.metrics())
 
 @login_required
 def post_create(request):
@@ -67,7 +109,109 @@ def login_view(request):
     return render(request, "posts/login.html", {"form": form})
 
 
+API_CHUNK_SIZE = 500
+API_DEFAULT_LIMIT = 100
+API_MAX_LIMIT = 1000
+API_FIELDS = (
+    "id", "title", "slug", "author", "content", "content_length", "status",
+    "created_at", "updated_at", "posted_at", "image", "price", "production_cost",
+    "margin", "is_profitable",
+)
+
+
+def _stream_serialized(posts):
+    yield "["
+    for i, post in enumerate(posts):
+        # serialize zwraca listę "[{...}]" - zdejmujemy nawiasy
+        yield ("," if i else "") + serializers.serialize("json", [post])[1:-1]
+    yield "]"
+
+
+@condition(etag_func=conditional.api_etag("posts_list_api", lambda request: Post.objects.all()))
 def posts_list_api(request):
+    # ten sam format co serializers.serialize("json", ...), ale strumieniowany
+    posts = Post.objects.order_by("id").iterator(chunk_size=API_CHUNK_SIZE)
+    return StreamingHttpResponse(_stream_serialized(posts), content_type="application/json")
+
+
+def _stream_posts(rows, fields, limit):
+    yield '{"results":['
+    last = None
+    has_next = False
+    for i, row in enumerate(rows):
+        if i == limit:
+            has_next = True
+            break
+        item = {field: row[field] for field in fields}
+        yield ("," if i else "") + json.dumps(item, cls=DjangoJSONEncoder)
+        last = row
+
+    next_cursor = encode_cursor(last["posted_at"], last["id"]) if has_next else None
+    yield '],"next":' + json.dumps(next_cursor) + "}"
+
+
+def _api_v2_query(request):
+    """
+    Parametry /api/v2/posts: (posts, fields, limit, cursor).
+    Błędne parametry - ValueError z komunikatem dla klienta.
+    """
+    fields = request.GET.get("fields")
+    if fields:
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(fields) - set(API_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        fields = list(API_FIELDS)
+
     posts = Post.objects.all()
-    data = serializers.serialize("json", posts)
-    return HttpResponse(data, headers={"Content-Type": "application/json"})
\ No newline at end of file
+
+    status = request.GET.get("status")
+    if status:
+        if status not in dict(Post.STATUS_CHOICES):
+            raise ValueError("Invalid status")
+        posts = posts.filter(status=status)
+
+    author = request.GET.get("author")
+    if author:
+        if not author.isdigit():
+            raise ValueError("Invalid author")
+        posts = posts.filter(author_id=int(author))
+
+    profitable = request.GET.get("profitable")
+    if profitable:
+        if profitable not in ("0", "1"):
+            raise ValueError("Invalid profitable")
+        posts = posts.profitable(profitable == "1")
+
+    cursor = request.GET.get("cursor")
+    try:
+        limit = max(1, min(int(request.GET.get("limit", API_DEFAULT_LIMIT)), API_MAX_LIMIT))
+        if cursor:
+            decode_cursor(cursor)
+    except (InvalidPage, ValueError):
+        raise ValueError("Invalid limit or cursor")
+
+    return posts, fields, limit, cursor
+
+
+@condition(etag_func=conditional.api_etag("posts_list_api_v2", lambda request: _api_v2_query(request)[0]))
+def posts_list_api_v2(request):
+    """
+    GET /api/v2/posts?fields=id,title&status=published&author=1&profitable=1&limit=100&cursor=...
+
+    Odpowiedź {"results": [...], "next": "<kursor następnej strony albo null>"}
+    jest strumieniowana wiersz po wierszu, więc pamięć nie zależy od rozmiaru tabeli.
+    """
+    try:
+        posts, fields, limit, cursor = _api_v2_query(request)
+        rows = KeysetPaginator(posts).iterator(
+            cursor,
+            limit=limit + 1,
+            fields=set(fields) | {"id", "posted_at"},
+            chunk_size=API_CHUNK_SIZE,
+        )
+    except (InvalidPage, ValueError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return StreamingHttpResponse(_stream_posts(rows, fields, limit), content_type="application/json")
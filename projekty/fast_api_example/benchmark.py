@@ -0,0 +1,147 @@
+"""
+Przepustowość API: InMemoryDbAdapter vs SqliteDbAdapter.
+
+Żądania idą przez httpx.ASGITransport prosto do aplikacji (bez sieci), więc
+mierzymy FastAPI + adapter.
+
+- równoległe obciążenie: każdy z `--concurrency` klientów wysyła po kolei
+  żądania: ~80% GET /items/{id}, ~20% POST /items/,
+- paczki: elementy na sekundę dla `--items` pojedynczych POST / PUT / DELETE
+  i dla tych samych zmian wysłanych przez /items/batch po `--batch-size`.
+
+    python benchmark.py --requests 5000 --concurrency 50 --items 2000 --batch-size 500
+"""
+import argparse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import random
+import tempfile
+import time
+
+import httpx
+
+from app import app
+from db_adapters import create_db_adapter
+
+
+async def run_client(client, requests, ids, rng):
+    for _ in range(requests):
+        if rng.random() < 0.8:
+            response = await client.get(f"/items/{rng.choice(ids)}")
+        else:
+            response = await client.post("/items/", json={"name": f"item {rng.random()}"})
+        response.raise_for_status()
+
+
+@asynccontextmanager
+async def api_client(url):
+    db = create_db_adapter(url)
+    await db.connect()
+    app.state.db = db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+    finally:
+        await db.close()
+
+
+async def benchmark(url, requests, concurrency, seed=0):
+    async with api_client(url) as client:
+        response = await client.post("/items/batch", json=[{"name": f"item {i}"} for i in range(1000)])
+        response.raise_for_status()
+        ids = [result["id"] for result in response.json()]
+
+        rng = random.Random(seed)
+        per_client = requests // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(client, per_client, ids, random.Random(rng.random()))
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return per_client * concurrency / elapsed
+
+
+async def timed(func, *args):
+    start = time.perf_counter()
+    await func(*args)
+    return time.perf_counter() - start
+
+
+async def batch_benchmark(url, items, batch_size):
+    """Elementy na sekundę: {operacja: (pojedynczo, paczkami)}."""
+    names = [{"name": f"item {i}"} for i in range(items)]
+
+    def batches(values):
+        return [values[i:i + batch_size] for i in range(0, len(values), batch_size)]
+
+    async with api_client(url) as client:
+        async def create_single():
+            for name in names:
+                (await client.post("/items/", json=name)).raise_for_status()
+
+        created = []
+
+        async def create_batch():
+            for batch in batches(names):
+                response = await client.post("/items/batch", json=batch)
+                response.raise_for_status()
+                created.extend(result["id"] for result in response.json())
+
+        async def update_single(ids):
+            for item_id in ids:
+                (await client.put(f"/items/{item_id}", json={"name": "updated"})).raise_for_status()
+
+        async def update_batch(ids):
+            for batch in batches(ids):
+                changes = {item_id: {"name": "updated"} for item_id in batch}
+                (await client.patch("/items/batch", json=changes)).raise_for_status()
+
+        async def delete_single(ids):
+            for item_id in ids:
+                (await client.delete(f"/items/{item_id}")).raise_for_status()
+
+        async def delete_batch(ids):
+            for batch in batches(ids):
+                (await client.request("DELETE", "/items/batch", json=batch)).raise_for_status()
+
+        create = (items / await timed(create_single), items / await timed(create_batch))
+        # pojedyncze i paczkowe zmiany na dwóch połowach elementów z create_batch
+        half = len(created) // 2
+        single_ids, batch_ids = created[:half], created[half:half * 2]
+        return {
+            "create": create,
+            "update": (half / await timed(update_single, single_ids), half / await timed(update_batch, batch_ids)),
+            "delete": (half / await timed(delete_single, single_ids), half / await timed(delete_batch, batch_ids)),
+        }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        urls = {
+            "memory": "memory://",
+            "sqlite": f"sqlite:///{os.path.join(tmp, 'items.db')}",
+        }
+        for name, url in urls.items():
+            rate = await benchmark(url, args.requests, args.concurrency)
+            print(f"{name:8} {rate:8.0f} req/s  ({args.requests} requests, concurrency {args.concurrency})")
+
+        for name, url in urls.items():
+            for operation, (single, batch) in (await batch_benchmark(url, args.items, args.batch_size)).items():
+                print(
+                    f"{name:8} {operation:6} single {single:8.0f} items/s  "
+                    f"batch {batch:9.0f} items/s  (x{batch / single:.0f}, batch size {args.batch_size})"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
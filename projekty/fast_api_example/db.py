@@ -1,7 +1,10 @@
+from memory_store import ItemStore
 from schemas import Item
 
-database: list[Item] = [
+database = ItemStore(Item, indexes=["name"])
+
+for item in [
     {"name": "Miecz"},
     {"name": "Tarcza"},
-]
-
+]:
+    database.insert(item)
@@ -0,0 +1,126 @@
+"""
+Silnik bazy w pamięci dla InMemoryDbAdapter.
+
+- id to licznik (auto-increment), a nie pozycja na liście - usunięcie
+  elementu nie zmienia id pozostałych,
+- elementy trzymane w słowniku id -> Item: get / create / update / delete w O(1),
+- przechowujemy gotowe (zwalidowane) obiekty Item - bez Item(**dict) przy odczycie,
+- opcjonalne indeksy na polach: pole -> wartość -> zbiór id (find_by w O(1)),
+- zapisy pod blokadą (FastAPI wykonuje zwykłe `def` w puli wątków),
+  odczyt listy to niezmienna migawka (copy-on-write) budowana raz po zmianie.
+
+    store = ItemStore(Item, indexes=["name"])
+    item_id = store.insert(Item(name="Miecz"))
+    store.get(item_id), store.find_by("name", "Miecz")
+    store.insert_many([...]), store.replace_many({id: item}), store.remove_many([id, ...])
+"""
+import threading
+from itertools import count
+
+from pydantic import BaseModel
+
+
+class ItemStore:
+    def __init__(self, model: type[BaseModel], indexes: list[str] | None = None):
+        self.model = model
+        self._items: dict[int, BaseModel] = {}
+        self._ids = count(1)
+        self._indexes: dict[str, dict] = {field: {} for field in indexes or []}
+        self._snapshot: tuple[tuple[int, BaseModel], ...] | None = None
+        self._lock = threading.RLock()
+
+    def _validated(self, item) -> BaseModel:
+        # Item jest niezmienny (frozen), więc obiekt z żądania możemy trzymać bez kopii
+        if isinstance(item, self.model):
+            return item
+        return self.model.model_validate(item)
+
+    def _index(self, item_id: int, item: BaseModel) -> None:
+        for field, index in self._indexes.items():
+            index.setdefault(getattr(item, field), set()).add(item_id)
+
+    def _unindex(self, item_id: int, item: BaseModel) -> None:
+        for field, index in self._indexes.items():
+            value = getattr(item, field)
+            ids = index[value]
+            ids.discard(item_id)
+            if not ids:
+                del index[value]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._items
+
+    def get(self, item_id: int) -> BaseModel | None:
+        return self._items.get(item_id)
+
+    def insert(self, item) -> int:
+        item = self._validated(item)
+        with self._lock:
+            item_id = next(self._ids)
+            self._items[item_id] = item
+            self._index(item_id, item)
+            self._snapshot = None
+        return item_id
+
+    def replace(self, item_id: int, item) -> BaseModel | None:
+        """Podmienia element. Zwraca poprzedni albo None, gdy nie ma takiego id."""
+        item = self._validated(item)
+        with self._lock:
+            old = self._items.get(item_id)
+            if old is None:
+                return None
+            self._unindex(item_id, old)
+            self._items[item_id] = item
+            self._index(item_id, item)
+            self._snapshot = None
+        return old
+
+    def remove(self, item_id: int) -> BaseModel | None:
+        """Usuwa element. Zwraca usunięty albo None, gdy nie ma takiego id."""
+        with self._lock:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                self._unindex(item_id, item)
+                self._snapshot = None
+        return item
+
+    def insert_many(self, items: list) -> list[int]:
+        items = [self._validated(item) for item in items]
+        with self._lock:
+            item_ids = [next(self._ids) for _ in items]
+            for item_id, item in zip(item_ids, items):
+                self._items[item_id] = item
+                self._index(item_id, item)
+            self._snapshot = None
+        return item_ids
+
+    def replace_many(self, items: dict[int, object]) -> dict[int, BaseModel | None]:
+        """Jak replace() dla wielu elementów, pod jedną blokadą. Zwraca id -> poprzedni element / None."""
+        items = {item_id: self._validated(item) for item_id, item in items.items()}
+        with self._lock:
+            return {item_id: self.replace(item_id, item) for item_id, item in items.items()}
+
+    def remove_many(self, item_ids: list[int]) -> list[BaseModel | None]:
+        """Jak remove() dla wielu elementów, pod jedną blokadą. Wyniki w kolejności item_ids."""
+        with self._lock:
+            return [self.remove(item_id) for item_id in item_ids]
+
+    def snapshot(self) -> tuple[tuple[int, BaseModel], ...]:
+        """Pary (id, element) w kolejności dodania - ta sama krotka aż do następnej zmiany."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = tuple(self._items.items())
+                snapshot = self._snapshot
+        return snapshot
+
+    def find_by(self, field: str, value) -> list[BaseModel]:
+        if field not in self._indexes:
+            raise ValueError(f"No index on field: {field}")
+        with self._lock:
+            ids = sorted(self._indexes[field].get(value, ()))
+            return [self._items[item_id] for item_id in ids]
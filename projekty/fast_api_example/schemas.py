@@ -1,4 +1,33 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class Item(BaseModel):
+    # niezmienny - baza w pamięci przechowuje i zwraca te same obiekty
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+
+
+class StoredItem(BaseModel):
+    """Element razem z id nadanym przez bazę - lista i odpowiedź POST /items/."""
+    model_config = ConfigDict(frozen=True)
+
+    id: int
     name: str
+
+    @classmethod
+    def from_item(cls, item_id: int, item: Item) -> "StoredItem":
+        # Item jest już zwalidowany - bez ponownej walidacji
+        return cls.model_construct(id=item_id, **dict(item))
+
+
+class ItemPage(BaseModel):
+    items: list[StoredItem]
+    # id ostatniego elementu strony - parametr cursor następnego żądania; None na ostatniej stronie
+    next_cursor: int | None = None
+
+
+class BatchItemResult(BaseModel):
+    """Wynik jednej operacji z POST / PATCH / DELETE /items/batch - w kolejności żądania."""
+    id: int
+    status: int
+    item: Item | None = None
@@ -0,0 +1,254 @@
+"""
+Adaptery SQL dla DbAdapter: SQLite (aiosqlite) i PostgreSQL (asyncpg).
+
+Połączenia są otwierane raz, w connect() (lifespan aplikacji), a nie przy
+każdym żądaniu.
+
+- SQLite: jedno połączenie do zapisu (SQLite i tak zapisuje po kolei, transakcje
+  pilnuje asyncio.Lock) + kilka połączeń do odczytu w trybie WAL - odczyty nie
+  czekają na zapis,
+- PostgreSQL: pula asyncpg.create_pool().
+
+Zapytania to stałe napisy z parametrami, więc są przygotowywane raz na
+połączenie: sqlite3 trzyma cache skompilowanych zapytań (cached_statements),
+asyncpg - cache prepared statements. Operacje na paczkach elementów to jedno
+zapytanie (json_each / unnest) w jednej transakcji. Lista jest stronicowana kursorem po id.
+
+    uvicorn app:app             # ITEMS_DATABASE_URL=sqlite:///items.db
+"""
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from db_adapters import DbAdapter
+from schemas import BatchItemResult, Item, StoredItem
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_name_idx ON items (name);
+"""
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id BIGSERIAL PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_name_idx ON items (name);
+"""
+
+
+def _item(name: str) -> Item:
+    # dane z naszej tabeli są już zwalidowane - bez ponownej walidacji
+    return Item.model_construct(name=name)
+
+
+def _created(item_ids, items):
+    # item_ids w kolejności elementów żądania - zapytania nie polegają na kolejności wierszy RETURNING
+    return [BatchItemResult(id=item_id, status=201, item=item) for item_id, item in zip(item_ids, items)]
+
+
+def _updated(items, updated):
+    return [
+        BatchItemResult(id=item_id, status=200, item=item) if item_id in updated
+        else BatchItemResult(id=item_id, status=404)
+        for item_id, item in items.items()
+    ]
+
+
+def _deleted(item_ids, deleted):
+    results = []
+    for item_id in item_ids:
+        # powtórzone id - usunięte tylko za pierwszym razem
+        results.append(BatchItemResult(id=item_id, status=204 if item_id in deleted else 404))
+        deleted.discard(item_id)
+    return results
+
+
+class SqliteDbAdapter(DbAdapter):
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self.readers = readers
+        self.writer = None
+        self._read_pool: asyncio.Queue | None = None
+        self._write_lock = asyncio.Lock()
+
+    async def _connect(self):
+        import aiosqlite
+
+        connection = await aiosqlite.connect(self.path, cached_statements=256)
+        await connection.execute("PRAGMA busy_timeout = 5000")
+        return connection
+
+    async def connect(self) -> None:
+        self.writer = await self._connect()
+        await self.writer.execute("PRAGMA journal_mode = WAL")
+        await self.writer.execute("PRAGMA synchronous = NORMAL")
+        await self.writer.executescript(SQLITE_SCHEMA)
+        await self.writer.commit()
+
+        self._read_pool = asyncio.Queue()
+        for _ in range(self.readers):
+            self._read_pool.put_nowait(await self._connect())
+
+    async def close(self) -> None:
+        if self._read_pool is not None:
+            while not self._read_pool.empty():
+                await self._read_pool.get_nowait().close()
+        if self.writer is not None:
+            await self.writer.close()
+
+    async def _fetch(self, sql, params=()):
+        connection = await self._read_pool.get()
+        try:
+            async with connection.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+        finally:
+            self._read_pool.put_nowait(connection)
+
+    @asynccontextmanager
+    async def _transaction(self):
+        async with self._write_lock:
+            try:
+                yield self.writer
+            except BaseException:
+                await self.writer.rollback()
+                raise
+            await self.writer.commit()
+
+    async def get_item(self, item_id: int) -> Item:
+        rows = await self._fetch("SELECT name FROM items WHERE id = ?", (item_id,))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return _item(rows[0][0])
+
+    async def get_items(self, limit: int = 100, after: int = 0) -> list[tuple[int, Item]]:
+        # kursor po kluczu głównym (bez OFFSET) - każda strona to wyszukiwanie w indeksie
+        rows = await self._fetch("SELECT id, name FROM items WHERE id > ? ORDER BY id LIMIT ?", (after, limit))
+        return [(row[0], _item(row[1])) for row in rows]
+
+    async def create_item(self, item: Item) -> StoredItem:
+        item_ids = await self._write_returning("INSERT INTO items (name) VALUES (?) RETURNING id", (item.name,))
+        return StoredItem.from_item(item_ids[0], item)
+
+    async def update_item(self, item_id: int, item: Item) -> Item:
+        async with self._transaction() as connection:
+            cursor = await connection.execute("UPDATE items SET name = ? WHERE id = ?", (item.name, item_id))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return item
+
+    async def delete_item(self, item_id: int) -> None:
+        async with self._transaction() as connection:
+            cursor = await connection.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Item not found")
+
+    # paczka to jedno zapytanie z parametrem JSON (json_each) - jedno przejście
+    # do wątku aiosqlite i jedna transakcja niezależnie od liczby elementów
+
+    async def _write_returning(self, sql, params):
+        async with self._transaction() as connection:
+            async with connection.execute(sql, params) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+
+    async def create_items(self, items: list[Item]) -> list[BatchItemResult]:
+        # id nadajemy jawnie: ostatnie id z sqlite_sequence + 1 + pozycja w paczce (key z json_each),
+        # więc posortowane id odpowiadają pozycjom niezależnie od kolejności wierszy RETURNING
+        item_ids = await self._write_returning(
+            "INSERT INTO items (id, name) "
+            "SELECT (SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'items') + key + 1, value "
+            "FROM json_each(?) RETURNING id",
+            (json.dumps([item.name for item in items]),),
+        )
+        return _created(sorted(item_ids), items)
+
+    async def update_items(self, items: dict[int, Item]) -> list[BatchItemResult]:
+        updated = await self._write_returning(
+            "UPDATE items SET name = u.name FROM ("
+            "SELECT json_extract(value, '$[0]') AS id, json_extract(value, '$[1]') AS name FROM json_each(?)"
+            ") AS u WHERE items.id = u.id RETURNING items.id",
+            (json.dumps([[item_id, item.name] for item_id, item in items.items()]),),
+        )
+        return _updated(items, set(updated))
+
+    async def delete_items(self, item_ids: list[int]) -> list[BatchItemResult]:
+        deleted = await self._write_returning(
+            "DELETE FROM items WHERE id IN (SELECT value FROM json_each(?)) RETURNING id",
+            (json.dumps(item_ids),),
+        )
+        return _deleted(item_ids, set(deleted))
+
+
+class PostgresDbAdapter(DbAdapter):
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 10):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool = None
+
+    async def connect(self) -> None:
+        import asyncpg
+
+        self.pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+        async with self.pool.acquire() as connection:
+            await connection.execute(POSTGRES_SCHEMA)
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def get_item(self, item_id: int) -> Item:
+        row = await self.pool.fetchrow("SELECT name FROM items WHERE id = $1", item_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return _item(row[0])
+
+    async def get_items(self, limit: int = 100, after: int = 0) -> list[tuple[int, Item]]:
+        rows = await self.pool.fetch("SELECT id, name FROM items WHERE id > $1 ORDER BY id LIMIT $2", after, limit)
+        return [(row[0], _item(row[1])) for row in rows]
+
+    async def create_item(self, item: Item) -> StoredItem:
+        item_id = await self.pool.fetchval("INSERT INTO items (name) VALUES ($1) RETURNING id", item.name)
+        return StoredItem.from_item(item_id, item)
+
+    async def update_item(self, item_id: int, item: Item) -> Item:
+        status = await self.pool.execute("UPDATE items SET name = $1 WHERE id = $2", item.name, item_id)
+        if status == "UPDATE 0":
+            raise HTTPException(status_code=404, detail="Item not found")
+        return item
+
+    async def delete_item(self, item_id: int) -> None:
+        status = await self.pool.execute("DELETE FROM items WHERE id = $1", item_id)
+        if status == "DELETE 0":
+            raise HTTPException(status_code=404, detail="Item not found")
+
+    # paczka to jedno zapytanie z tablicami (unnest) - jedna transakcja niezależnie od liczby elementów
+
+    async def create_items(self, items: list[Item]) -> list[BatchItemResult]:
+        # id z sekwencji przypisane do pozycji (n) w CTE, a wynik czytamy z CTE posortowany po n
+        rows = await self.pool.fetch(
+            "WITH input AS ("
+            "SELECT nextval(pg_get_serial_sequence('items', 'id')) AS id, name, n "
+            "FROM unnest($1::text[]) WITH ORDINALITY AS t(name, n)"
+            "), inserted AS (INSERT INTO items (id, name) SELECT id, name FROM input) "
+            "SELECT id FROM input ORDER BY n",
+            [item.name for item in items],
+        )
+        return _created([row[0] for row in rows], items)
+
+    async def update_items(self, items: dict[int, Item]) -> list[BatchItemResult]:
+        rows = await self.pool.fetch(
+            "UPDATE items SET name = u.name FROM unnest($1::bigint[], $2::text[]) AS u(id, name) "
+            "WHERE items.id = u.id RETURNING items.id",
+            list(items), [item.name for item in items.values()],
+        )
+        return _updated(items, {row[0] for row in rows})
+
+    async def delete_items(self, item_ids: list[int]) -> list[BatchItemResult]:
+        rows = await self.pool.fetch("DELETE FROM items WHERE id = ANY($1::bigint[]) RETURNING id", item_ids)
+        return _deleted(item_ids, {row[0] for row in rows})
@@ -0,0 +1,150 @@
+"""
+Testy API przez httpx.ASGITransport (jak benchmark.py) dla każdego adaptera.
+
+    cd projekty/fast_api_example && python -m unittest discover -s tests -t .
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+
+from app import app
+from db_adapters import create_db_adapter
+from memory_store import ItemStore
+from schemas import Item
+
+
+class ApiTestsMixin:
+    def database_url(self) -> str:
+        raise NotImplementedError
+
+    async def asyncSetUp(self):
+        db = create_db_adapter(self.database_url())
+        await db.connect()
+        self.addAsyncCleanup(db.close)
+        app.state.db = db
+        transport = httpx.ASGITransport(app=app)
+        self.client = await self.enterAsyncContext(httpx.AsyncClient(transport=transport, base_url="http://test"))
+
+    async def create(self, *names):
+        response = await self.client.post("/items/batch", json=[{"name": name} for name in names])
+        self.assertEqual(response.status_code, 200)
+        return [result["id"] for result in response.json()]
+
+    async def all_ids(self):
+        return [json.loads(line)["id"] for line in (await self.client.get("/items?format=ndjson")).text.splitlines()]
+
+    async def test_create_returns_id(self):
+        response = await self.client.post("/items/", json={"name": "Miecz"})
+        created = response.json()
+        self.assertEqual((await self.client.get(f"/items/{created['id']}")).json(), {"name": "Miecz"})
+
+    async def test_ids_stable_after_delete(self):
+        first, second, third = await self.create("a", "b", "c")
+        self.assertEqual((await self.client.delete(f"/items/{second}")).status_code, 200)
+
+        self.assertEqual((await self.client.get(f"/items/{first}")).json(), {"name": "a"})
+        self.assertEqual((await self.client.get(f"/items/{third}")).json(), {"name": "c"})
+        self.assertEqual((await self.client.get(f"/items/{second}")).status_code, 404)
+        # usunięte id nie wraca przy kolejnym dodaniu
+        created = (await self.client.post("/items/", json={"name": "d"})).json()
+        self.assertGreater(created["id"], third)
+
+    async def test_cursor_pages_without_gaps_or_duplicates(self):
+        ids = await self.create(*(f"item {i}" for i in range(21)))
+        expected = await self.all_ids()
+        self.assertTrue(set(ids) <= set(expected))
+
+        seen, cursor, pages = [], 0, 0
+        while cursor is not None:
+            page = (await self.client.get("/items", params={"limit": 7, "cursor": cursor})).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            pages += 1
+            if pages == 2:
+                # zmiana w już przeczytanej części listy nie przesuwa kolejnych stron
+                await self.client.delete(f"/items/{seen[0]}")
+        self.assertEqual(seen, expected)
+
+    async def test_batch_unknown_ids(self):
+        first, second = await self.create("a", "b")
+        missing = second + 1000
+
+        changes = {str(first): {"name": "a2"}, str(missing): {"name": "x"}}
+        response = await self.client.patch("/items/batch", json=changes)
+        self.assertEqual(
+            [(result["id"], result["status"]) for result in response.json()], [(first, 200), (missing, 404)]
+        )
+        self.assertEqual((await self.client.get(f"/items/{first}")).json(), {"name": "a2"})
+
+        response = await self.client.request("DELETE", "/items/batch", json=[second, missing, second])
+        self.assertEqual(
+            [(result["id"], result["status"]) for result in response.json()],
+            [(second, 204), (missing, 404), (second, 404)],
+        )
+        self.assertEqual((await self.client.get(f"/items/{second}")).status_code, 404)
+        self.assertEqual((await self.client.get(f"/items/{first}")).status_code, 200)
+
+    async def test_batch_create_ids_follow_input_positions(self):
+        names = [f"item {i}" for i in reversed(range(50))]
+        await self.create("before")
+        last = (await self.client.post("/items/", json={"name": "single"})).json()["id"]
+        await self.client.delete(f"/items/{last}")
+
+        response = await self.client.post("/items/batch", json=[{"name": name} for name in names])
+        results = response.json()
+        self.assertEqual([result["item"]["name"] for result in results], names)
+        self.assertEqual([result["status"] for result in results], [201] * len(names))
+        ids = [result["id"] for result in results]
+        self.assertEqual(len(set(ids)), len(names))
+        self.assertGreater(min(ids), last)
+        for item_id, name in zip(ids, names):
+            self.assertEqual((await self.client.get(f"/items/{item_id}")).json(), {"name": name})
+
+    async def test_mixed_batch_patch(self):
+        ids = await self.create("a", "b", "c")
+        changes = {ids[2]: "c2", ids[2] + 100: "x", ids[0]: "a2", ids[0] + 100: "y"}
+        response = await self.client.patch(
+            "/items/batch", json={str(item_id): {"name": name} for item_id, name in changes.items()}
+        )
+        self.assertEqual(
+            [(result["id"], result["status"], result["item"]) for result in response.json()],
+            [
+                (ids[2], 200, {"name": "c2"}), (ids[2] + 100, 404, None),
+                (ids[0], 200, {"name": "a2"}), (ids[0] + 100, 404, None),
+            ],
+        )
+        names = [(await self.client.get(f"/items/{item_id}")).json()["name"] for item_id in ids]
+        self.assertEqual(names, ["a2", "b", "c2"])
+
+    async def test_ndjson_lines_carry_ids(self):
+        # więcej niż jedna strona iter_pages (1000 elementów)
+        ids = await self.create(*(f"item {i}" for i in range(1500)))
+        response = await self.client.get("/items", params={"format": "ndjson", "cursor": ids[0]})
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines, [{"id": item_id, "name": f"item {i}"} for i, item_id in enumerate(ids) if i])
+
+
+class InMemoryApiTests(ApiTestsMixin, unittest.IsolatedAsyncioTestCase):
+    def database_url(self):
+        return "memory://"
+
+    async def asyncSetUp(self):
+        # świeży magazyn zamiast globalnego db.database
+        self.enterContext(mock.patch("db_adapters.database", ItemStore(Item, indexes=["name"])))
+        await super().asyncSetUp()
+
+
+class SqliteApiTests(ApiTestsMixin, unittest.IsolatedAsyncioTestCase):
+    def database_url(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return f"sqlite:///{os.path.join(directory.name, 'items.db')}"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from memory_store import ItemStore
+from schemas import Item
+
+
+class ItemStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ItemStore(Item, indexes=["name"])
+
+    def test_index_follows_changes(self):
+        sword, shield = self.store.insert_many([{"name": "Miecz"}, Item(name="Tarcza")])
+        self.store.insert(Item(name="Miecz"))
+        self.assertEqual(len(self.store.find_by("name", "Miecz")), 2)
+
+        self.assertEqual(self.store.replace(sword, Item(name="Topór")), Item(name="Miecz"))
+        self.assertEqual(self.store.remove(shield), Item(name="Tarcza"))
+        self.assertEqual(self.store.find_by("name", "Miecz"), [Item(name="Miecz")])
+        self.assertEqual(self.store.find_by("name", "Topór"), [Item(name="Topór")])
+        self.assertEqual(self.store.find_by("name", "Tarcza"), [])
+        self.assertIsNone(self.store.replace(shield, Item(name="x")))
+        with self.assertRaises(ValueError):
+            self.store.find_by("price", 1)
+
+    def test_snapshot_is_copy_on_write(self):
+        first, second = self.store.insert_many([Item(name="a"), Item(name="b")])
+        snapshot = self.store.snapshot()
+        self.assertIs(self.store.snapshot(), snapshot)
+
+        self.store.remove(first)
+        self.assertEqual([item_id for item_id, _ in snapshot], [first, second])
+        self.assertEqual([item_id for item_id, _ in self.store.snapshot()], [second])
+
+    def test_batch_results_in_request_order(self):
+        first, second = self.store.insert_many([Item(name="a"), Item(name="b")])
+        previous = self.store.replace_many({second: Item(name="b2"), 99: Item(name="x")})
+        self.assertEqual(previous, {second: Item(name="b"), 99: None})
+        self.assertEqual(self.store.remove_many([first, 99, first]), [Item(name="a"), None, None])
+        self.assertEqual(len(self.store), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
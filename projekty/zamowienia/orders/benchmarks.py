@@ -0,0 +1,195 @@
+"""
+Benchmark i test regresji domeny zamówień.
+
+Dla każdej skali (liczby pozycji zamówień) dane są generowane przez
+BulkOrderBuilder (fabryki z orders.factories), mierzone są scenariusze:
+
+- order_listing    - strona najnowszych zamówień z klientem i pozycjami,
+- order_totals     - kwoty zamówień policzone z pozycji (with_totals) i suma Order.total,
+- customer_history - historia zamówień jednego klienta z produktami,
+- category_revenue - raport przychodu wg kategorii (orders.reports),
+
+a potem dane są wycofywane (rollback). Dla scenariusza zapisujemy liczbę
+zapytań, najlepszy czas z kilku powtórzeń i szczytowe zużycie pamięci
+(tracemalloc, osobne uruchomienie - tracemalloc spowalnia kod).
+
+    python manage.py benchmark_orders --scales 1000 100000 1000000 --output main.json
+    python manage.py benchmark_orders --baseline main.json --output branch.json
+
+Błędy zwraca compare():
+
+- N+1 - liczba zapytań rośnie razem z liczbą danych,
+- więcej zapytań niż w wyniku bazowym,
+- czas większy niż max_slowdown * czas bazowy (pomijamy różnice poniżej
+  min_delta sekund - to szum pomiaru).
+"""
+import platform
+import time
+import tracemalloc
+
+import django
+from django.db import connection, transaction
+from django.db.models import Count, Prefetch, Sum
+from django.test.utils import CaptureQueriesContext
+
+from . import reports
+from .builders import BulkOrderBuilder
+from .models import Customer, Order, OrderProduct
+
+SCALES = (1_000, 100_000, 1_000_000)
+LINES_PER_ORDER = (2, 4)
+PAGE_SIZE = 50
+
+
+def _lines_prefetch():
+    return Prefetch('order_products', queryset=OrderProduct.objects.select_related('product').order_by('pk'))
+
+
+def order_listing(state):
+    orders = (
+        Order.objects.select_related('customer')
+        .prefetch_related(_lines_prefetch())
+        .order_by('-created_at', '-pk')[:PAGE_SIZE]
+    )
+    return [
+        (order.customer.name, order.total_price, [(line.product.name, line.line_total) for line in order.order_products.all()])
+        for order in orders
+    ]
+
+
+def order_totals(state):
+    totals = list(Order.objects.with_totals().order_by('-pk').values_list('pk', 'computed_total')[:PAGE_SIZE * 10])
+    return totals, Order.objects.aggregate(revenue=Sum('total'))['revenue']
+
+
+def customer_history(state):
+    orders = (
+        Order.objects.filter(customer_id=state['customer_id'])
+        .prefetch_related(_lines_prefetch())
+        .order_by('-created_at', '-pk')
+    )
+    return [
+        (order.created_at, order.total_price, [(line.product.name, line.quantity) for line in order.order_products.all()])
+        for order in orders
+    ]
+
+
+def category_revenue(state):
+    return list(reports.category_revenue())
+
+
+SCENARIOS = {
+    'order_listing': order_listing,
+    'order_totals': order_totals,
+    'customer_history': customer_history,
+    'category_revenue': category_revenue,
+}
+
+
+def measure(func, state, repeat=3):
+    """Zwraca {'queries', 'seconds', 'peak_kib'} dla jednego scenariusza."""
+    with CaptureQueriesContext(connection) as queries:
+        func(state)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        func(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'queries': len(queries), 'seconds': round(best, 6), 'peak_kib': round(peak / 1024, 1)}
+
+
+def run_scale(lines, seed=0, repeat=3, scenarios=None, log=None):
+    """
+    Generuje ok. `lines` pozycji, mierzy scenariusze i wycofuje dane.
+    Klienci i produkty są współdzieleni (pule rosną wolniej niż zamówienia).
+    """
+    scenarios = scenarios or SCENARIOS
+    orders = max(1, lines // (sum(LINES_PER_ORDER) // 2))
+    with transaction.atomic():
+        stats = BulkOrderBuilder(
+            seed=seed,
+            categories=20,
+            products=min(5000, max(10, lines // 100)),
+            customers=min(50_000, max(10, orders // 20)),
+            lines_per_order=LINES_PER_ORDER,
+        ).build(orders)
+        if log:
+            log(f"Seeded {stats['lines']} lines ({stats['orders']} orders) in {stats['seconds']:.1f}s")
+
+        customer_id = (
+            Customer.objects.annotate(order_count=Count('orders'))
+            .order_by('-order_count', 'pk').values_list('pk', flat=True).first()
+        )
+        state = {'customer_id': customer_id}
+        result = {
+            'lines': stats['lines'],
+            'orders': stats['orders'],
+            'seed_seconds': round(stats['seconds'], 3),
+            'scenarios': {name: measure(func, state, repeat) for name, func in scenarios.items()},
+        }
+        transaction.set_rollback(True)
+    return result
+
+
+def run_benchmarks(scales=SCALES, seed=0, repeat=3, scenarios=None, log=None):
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'scales': {
+            str(lines): run_scale(lines, seed, repeat, scenarios, log)
+            for lines in sorted(scales)
+        },
+    }
+
+
+def compare(results, baseline=None, max_slowdown=1.5, min_delta=0.01):
+    """Lista opisów problemów (pusta - brak regresji)."""
+    problems = []
+    scales = sorted(results['scales'].items(), key=lambda item: int(item[0]))
+
+    # N+1: ta sama praca na większych danych nie może wymagać więcej zapytań
+    if len(scales) > 1:
+        smallest, first = scales[0]
+        for scale, result in scales[1:]:
+            for name, current in result['scenarios'].items():
+                expected = first['scenarios'].get(name, {}).get('queries')
+                if expected is not None and current['queries'] > expected:
+                    problems.append(
+                        f"{name}: {current['queries']} queries at {scale} lines, "
+                        f"{expected} at {smallest} lines (N+1?)"
+                    )
+
+    if baseline:
+        for scale, result in scales:
+            base_scale = baseline['scales'].get(scale)
+            if not base_scale:
+                continue
+            for name, current in result['scenarios'].items():
+                base = base_scale['scenarios'].get(name)
+                if not base:
+                    continue
+                if current['queries'] > base['queries']:
+                    problems.append(
+                        f"{name} @ {scale}: {current['queries']} queries, baseline {base['queries']}"
+                    )
+                slower = current['seconds'] - base['seconds']
+                if current['seconds'] > base['seconds'] * max_slowdown and slower > min_delta:
+                    problems.append(
+                        f"{name} @ {scale}: {current['seconds']:.3f}s, baseline {base['seconds']:.3f}s"
+                    )
+    return problems
@@ -0,0 +1,125 @@
+"""
+Szybkie generowanie dużych zbiorów zamówień (testy obciążeniowe).
+
+OrderProductFactory.create_batch(n) zapisuje wiersze po jednym, a SubFactory
+tworzy nowe zamówienie, klienta, produkt i kategorię dla każdej pozycji.
+BulkOrderBuilder:
+
+- tworzy pule rodziców fabrykami (CategoryFactory, ProductFactory,
+  CustomerFactory - .build(), bez zapisu) i zapisuje je bulk_create,
+- zamówienia i pozycje buduje w pamięci paczkami po batch_size zamówień
+  i zapisuje bulk_create w kolejności zależności (Order -> OrderProduct),
+- losuje klientów / produkty z puli - rodzice są współdzieleni,
+- przy tym samym seed daje te same dane.
+
+Pozycje i zamówienia to zwykłe obiekty modeli (factory._meta.model), a nie
+.build() fabryki - narzut factory_boy (~80 µs na obiekt) przy milionie
+wierszy to kilka minut.
+
+    from orders.builders import BulkOrderBuilder
+    BulkOrderBuilder(seed=42).build(orders=250_000)   # ~750k pozycji
+
+albo: python manage.py generate_orders --orders 250000 --seed 42
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import factory.random
+from django.db import connection, transaction
+
+from .factories import CategoryFactory, CustomerFactory, OrderFactory, OrderProductFactory, ProductFactory
+
+# daty zamówień liczymy wstecz od stałego punktu - ten sam seed, te same dane
+DEFAULT_ANCHOR = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class BulkOrderBuilder:
+    def __init__(self, seed=None, categories=20, products=500, customers=1000,
+                 lines_per_order=(1, 5), quantity=(1, 10), days=365, anchor=DEFAULT_ANCHOR, batch_size=5000):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.categories = categories
+        self.products = products
+        self.customers = customers
+        self.lines_per_order = lines_per_order
+        self.quantity = quantity
+        self.days = days
+        self.anchor = anchor
+        self.batch_size = batch_size
+
+    def build(self, orders):
+        """Zapisuje pule rodziców i `orders` zamówień z pozycjami. Zwraca statystyki."""
+        start = time.perf_counter()
+        if self.seed is not None:
+            # Faker w fabrykach (nazwy klientów, e-maile) też powtarzalny
+            factory.random.reseed_random(self.seed)
+            CategoryFactory.reset_sequence()
+            ProductFactory.reset_sequence()
+
+        categories = self._create_parents(CategoryFactory, self.categories)
+        products = self._create_parents(
+            ProductFactory, self.products,
+            category=lambda: self.rng.choice(categories),
+            price=lambda: Decimal(self.rng.randint(100, 100_000)) / 100,
+        )
+        customers = self._create_parents(CustomerFactory, self.customers)
+
+        created_orders = 0
+        created_lines = 0
+        order_model = OrderFactory._meta.model
+        for offset in range(0, orders, self.batch_size):
+            count = min(self.batch_size, orders - offset)
+            batch = [order_model(customer=self.rng.choice(customers)) for _ in range(count)]
+            dates = [
+                self.anchor - timedelta(seconds=self.rng.randint(0, self.days * 86400))
+                for _ in range(count)
+            ]
+            lines = []
+            with transaction.atomic():
+                # auto_now_add ustawia created_at na "teraz" przy INSERT - wylosowane
+                # daty zapisujemy zaraz potem, w tej samej transakcji
+                order_model.objects.bulk_create(batch)
+                self._set_created_at(batch, dates)
+                for order in batch:
+                    for _ in range(self.rng.randint(*self.lines_per_order)):
+                        product = self.rng.choice(products)
+                        lines.append(OrderProductFactory._meta.model(
+                            order=order, product=product, unit_price=product.price,
+                            quantity=self.rng.randint(*self.quantity),
+                        ))
+                # bulk_create pozycji przelicza też Order.total tej paczki zamówień
+                OrderProductFactory._meta.model.objects.bulk_create(lines, batch_size=self.batch_size)
+            created_orders += len(batch)
+            created_lines += len(lines)
+
+        return {
+            'categories': len(categories),
+            'products': len(products),
+            'customers': len(customers),
+            'orders': created_orders,
+            'lines': created_lines,
+            'seconds': time.perf_counter() - start,
+        }
+
+    def _set_created_at(self, orders, dates):
+        # executemany z jednym UPDATE ... WHERE id = %s - bulk_update buduje CASE
+        # z tysiącami WHEN w Pythonie i przy milionie wierszy jest kilka razy wolniejszy
+        model = OrderFactory._meta.model
+        field = model._meta.get_field('created_at')
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = %s WHERE {qn(model._meta.pk.column)} = %s',
+                [(field.get_db_prep_value(date, connection), order.pk) for order, date in zip(orders, dates)],
+            )
+        for order, date in zip(orders, dates):
+            order.created_at = date
+
+    def _create_parents(self, factory_class, count, **overrides):
+        objects = [
+            factory_class.build(**{name: value() for name, value in overrides.items()})
+            for _ in range(count)
+        ]
+        return factory_class._meta.model.objects.bulk_create(objects, batch_size=self.batch_size)
@@ -0,0 +1,225 @@
+"""
+Hierarchia pracowników (Employee.manager) bez jednego zapytania na poziom.
+
+Dwa tryby odczytu (settings.ORDERS_EMPLOYEE_HIERARCHY):
+
+- 'cte'  (domyślnie) - rekurencyjne CTE (WITH RECURSIVE, sqlite i postgres),
+  jedno zapytanie na łańcuch przełożonych / poddrzewo,
+- 'path' - zmaterializowana ścieżka Employee.path ("/1/5/9/"): przodkowie
+  to id zapisane w ścieżce, poddrzewo to path LIKE '/1/5/%' (indeks, bez
+  rekurencji). Dla stron czytanych często.
+
+Poddrzewo to prefiks ścieżki, a nie zakres path > '/1/5/' AND path < '/1/50':
+porównanie zakresem zależy od kolacji, a w postgresie z kolacją inną niż "C"
+'/' jest pomijane przy porównaniu i zakres łapie obce gałęzie. LIKE z
+prefiksem korzysta z indeksu *_like (text_pattern_ops), który Django
+zakłada w postgresie obok zwykłego indeksu na polu z db_index.
+
+Ścieżka ma najwyżej MAX_DEPTH poziomów nad pracownikiem - głębsze
+przypisanie (także przeniesienie poddrzewa) kończy się ValueError.
+
+Ścieżka jest utrzymywana zawsze (Employee.save() / delete()), więc tryb można
+przełączyć bez migracji danych. Zmiany masowe (queryset.update(manager=...),
+SET_NULL po usunięciu przełożonego przez queryset.delete()) naprawia
+rebuild_paths().
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
+
+# zabezpieczenie przed pętlą w danych (a.manager = b, b.manager = a)
+MAX_DEPTH = 100
+
+ANCESTORS_SQL = """
+WITH RECURSIVE chain(id, manager_id, distance) AS (
+    SELECT id, manager_id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT e.id, e.manager_id, chain.distance + 1
+    FROM {table} e JOIN chain ON e.id = chain.manager_id
+    WHERE chain.distance < %s
+)
+SELECT e.*, chain.distance FROM chain JOIN {table} e ON e.id = chain.id
+WHERE chain.distance > 0
+ORDER BY chain.distance
+"""
+
+DESCENDANTS_SQL = """
+WITH RECURSIVE tree(id, distance) AS (
+    SELECT id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT e.id, tree.distance + 1
+    FROM {table} e JOIN tree ON e.manager_id = tree.id
+    WHERE tree.distance < %s
+)
+SELECT e.*, tree.distance FROM tree JOIN {table} e ON e.id = tree.id
+WHERE tree.distance > 0
+ORDER BY tree.distance, e.id
+"""
+
+DEPTH_SQL = """
+WITH RECURSIVE chain(id, manager_id, distance) AS (
+    SELECT id, manager_id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT e.id, e.manager_id, chain.distance + 1
+    FROM {table} e JOIN chain ON e.id = chain.manager_id
+    WHERE chain.distance < %s
+)
+SELECT MAX(distance) FROM chain
+"""
+
+HEADCOUNT_SQL = """
+WITH RECURSIVE tree(id, distance) AS (
+    SELECT id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT e.id, tree.distance + 1
+    FROM {table} e JOIN tree ON e.manager_id = tree.id
+    WHERE tree.distance < %s
+)
+SELECT COUNT(*) - 1 FROM tree
+"""
+
+REBUILD_PATHS_SQL = """
+WITH RECURSIVE paths(id, path, distance) AS (
+    SELECT id, '/' || id || '/', 0 FROM {table} WHERE manager_id IS NULL
+    UNION ALL
+    SELECT e.id, paths.path || e.id || '/', paths.distance + 1
+    FROM {table} e JOIN paths ON e.manager_id = paths.id
+    WHERE paths.distance < %s
+)
+UPDATE {table} SET path = COALESCE((SELECT paths.path FROM paths WHERE paths.id = {table}.id), '')
+"""
+
+
+def get_mode():
+    mode = getattr(settings, 'ORDERS_EMPLOYEE_HIERARCHY', 'cte')
+    if mode not in ('cte', 'path'):
+        raise ValueError(f'Unknown employee hierarchy mode: {mode}')
+    return mode
+
+
+def _sql(template, model):
+    return template.format(table=connection.ops.quote_name(model._meta.db_table))
+
+
+def _scalar(template, model, params):
+    with connection.cursor() as cursor:
+        cursor.execute(_sql(template, model), params)
+        return cursor.fetchone()[0]
+
+
+def subtree(path):
+    """Filtr poddrzewa po ścieżce (bez samego pracownika): '/1/5/' -> path LIKE '/1/5/%' AND path <> '/1/5/'."""
+    return Q(path__startswith=path) & ~Q(path=path)
+
+
+def path_depth(path):
+    """Liczba przełożonych zapisana w ścieżce: '/1/5/9/' -> 2."""
+    return path.count('/') - 2
+
+
+def ancestors(employee):
+    """Przełożeni od bezpośredniego do najwyższego, z atrybutem distance."""
+    model = type(employee)
+    if get_mode() == 'path' and employee.path:
+        ids = [int(pk) for pk in employee.path.strip('/').split('/')[:-1]]
+        found = model.objects.in_bulk(ids)
+        result = []
+        for distance, pk in enumerate(reversed(ids), start=1):
+            found[pk].distance = distance
+            result.append(found[pk])
+        return result
+    return list(model.objects.raw(_sql(ANCESTORS_SQL, model), [employee.pk, MAX_DEPTH]))
+
+
+def descendants(employee):
+    """Całe poddrzewo (bez samego pracownika) poziomami, z atrybutem distance."""
+    model = type(employee)
+    if get_mode() == 'path' and employee.path:
+        base = employee.path.count('/')
+        result = list(model.objects.filter(subtree(employee.path)))
+        for item in result:
+            item.distance = item.path.count('/') - base
+        return sorted(result, key=lambda item: (item.distance, item.pk))
+    return list(model.objects.raw(_sql(DESCENDANTS_SQL, model), [employee.pk, MAX_DEPTH]))
+
+
+def depth(employee):
+    """Liczba przełożonych nad pracownikiem (0 - szczyt hierarchii)."""
+    if get_mode() == 'path' and employee.path:
+        return path_depth(employee.path)
+    return _scalar(DEPTH_SQL, type(employee), [employee.pk, MAX_DEPTH]) or 0
+
+
+def subtree_headcount(employee):
+    """Liczba wszystkich podwładnych (bezpośrednich i pośrednich)."""
+    model = type(employee)
+    if get_mode() == 'path' and employee.path:
+        return model.objects.filter(subtree(employee.path)).count()
+    return _scalar(HEADCOUNT_SQL, model, [employee.pk, MAX_DEPTH])
+
+
+def update_path(employee, manager_path):
+    """
+    Zapisuje ścieżkę pracownika i przepisuje ścieżki jego poddrzewa
+    (jeden UPDATE z podmianą prefiksu), jeżeli przełożony się zmienił.
+    ValueError, gdy pracownik albo ktoś z jego poddrzewa byłby głębiej niż MAX_DEPTH.
+    """
+    model = type(employee)
+    old_path = model.objects.filter(pk=employee.pk).values_list('path', flat=True).get()
+    new_path = f'{manager_path}{employee.pk}/'
+    if old_path == new_path:
+        employee.path = new_path
+        return
+
+    deepest = path_depth(new_path)
+    if old_path:
+        paths = model.objects.filter(subtree(old_path)).values_list('path', flat=True)
+        deepest += max((path.count('/') - old_path.count('/') for path in paths), default=0)
+    if deepest > MAX_DEPTH:
+        raise ValueError(f'Employee hierarchy cannot be deeper than {MAX_DEPTH} levels')
+
+    model.objects.filter(pk=employee.pk).update(path=new_path)
+    if old_path:
+        model.objects.filter(subtree(old_path)).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+        )
+    employee.path = new_path
+
+
+def detach_subtree(employee):
+    """Przed usunięciem: podwładni zostają bez przełożonego (SET_NULL), ich poddrzewa od '/'."""
+    if employee.path:
+        type(employee).objects.filter(subtree(employee.path)).update(
+            path=Concat(Value('/'), Substr('path', len(employee.path) + 1))
+        )
+
+
+def rebuild_paths(model):
+    """Przelicza wszystkie ścieżki jednym UPDATE z rekurencyjnym CTE."""
+    with connection.cursor() as cursor:
+        cursor.execute(_sql(REBUILD_PATHS_SQL, model), [MAX_DEPTH])
+
+
+def org_chart(queryset):
+    """
+    Drzewo organizacji z jednego zapytania: lista pracowników najwyższego
+    poziomu, każdy z .children (lista), .level i .headcount (całe poddrzewo).
+    """
+    employees = list(queryset.order_by('name', 'pk'))
+    by_id = {employee.pk: employee for employee in employees}
+    roots = []
+    for employee in employees:
+        employee.children = []
+    for employee in employees:
+        manager = by_id.get(employee.manager_id)
+        (manager.children if manager else roots).append(employee)
+
+    def walk(employee, level):
+        employee.level = level
+        employee.headcount = sum(walk(child, level + 1) + 1 for child in employee.children)
+        return employee.headcount
+
+    for root in roots:
+        walk(root, 0)
+    return roots
@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy liczbę zapytań, czas i pamięć scenariuszy zamówień na kilku skalach "
+        "danych (dane są wycofywane po pomiarze). Kończy się błędem przy N+1 lub regresji."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=list(benchmarks.SCALES),
+                            help='Liczby pozycji zamówień')
+        parser.add_argument('--repeat', type=int, default=3, help='Liczba powtórzeń pomiaru czasu')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Plik JSON z wynikami')
+        parser.add_argument('--baseline', help='Plik JSON z wynikami do porównania (np. z gałęzi main)')
+        parser.add_argument('--max-slowdown', type=float, default=1.5,
+                            help='Dopuszczalny stosunek czasu do czasu bazowego')
+        parser.add_argument('--min-delta', type=float, default=0.01,
+                            help='Różnica czasu (s) poniżej której nie zgłaszamy regresji')
+
+    def handle(self, *args, **options):
+        if any(scale < 1 for scale in options['scales']) or options['repeat'] < 1:
+            raise CommandError('--scales and --repeat must be positive')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        results = benchmarks.run_benchmarks(
+            options['scales'], seed=options['seed'], repeat=options['repeat'], log=self.stdout.write,
+        )
+
+        for scale, result in results['scales'].items():
+            self.stdout.write(f'{scale} lines')
+            for name, row in result['scenarios'].items():
+                self.stdout.write(
+                    f"  {name:18} {row['queries']:3} queries {row['seconds'] * 1000:9.1f} ms "
+                    f"{row['peak_kib']:10.1f} KiB"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results saved to {options['output']}")
+
+        problems = benchmarks.compare(results, baseline, options['max_slowdown'], options['min_delta'])
+        if problems:
+            raise CommandError('Performance regression:\n' + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.builders import BulkOrderBuilder
+
+
+class Command(BaseCommand):
+    help = "Generuje zamówienia z pozycjami do testów obciążeniowych (bulk_create, współdzieleni klienci i produkty)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10_000, help='Liczba zamówień')
+        parser.add_argument('--min-lines', type=int, default=1, help='Minimalna liczba pozycji w zamówieniu')
+        parser.add_argument('--max-lines', type=int, default=5, help='Maksymalna liczba pozycji w zamówieniu')
+        parser.add_argument('--customers', type=int, default=1000, help='Wielkość puli klientów')
+        parser.add_argument('--products', type=int, default=500, help='Wielkość puli produktów')
+        parser.add_argument('--categories', type=int, default=20, help='Liczba kategorii')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Liczba zamówień w jednej paczce')
+        parser.add_argument('--seed', type=int, default=None, help='Ziarno losowości (powtarzalne dane)')
+
+    def handle(self, *args, **options):
+        positive = ['orders', 'min_lines', 'customers', 'products', 'categories', 'batch_size']
+        if any(options[name] < 1 for name in positive) or options['max_lines'] < options['min_lines']:
+            raise CommandError('Counts must be positive and --max-lines >= --min-lines')
+
+        stats = BulkOrderBuilder(
+            seed=options['seed'],
+            categories=options['categories'],
+            products=options['products'],
+            customers=options['customers'],
+            lines_per_order=(options['min_lines'], options['max_lines']),
+            batch_size=options['batch_size'],
+        ).build(options['orders'])
+
+        rate = stats['lines'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {stats['orders']} orders with {stats['lines']} lines "
+            f"in {stats['seconds']:.1f}s ({rate:.0f} lines/s)"
+        ))
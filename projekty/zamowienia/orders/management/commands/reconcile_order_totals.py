@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje Order.total z sumą pozycji zamówienia (paczkami po id) "
+        "i z --fix poprawia rozbieżne zamówienia"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Liczba zamówień w jednej paczce')
+        parser.add_argument('--fix', action='store_true', help='Poprawia znalezione rozbieżności')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        last_pk = 0
+        checked = 0
+        mismatched = 0
+        while True:
+            pks = list(
+                Order.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            # jedno zapytanie z GROUP BY na paczkę - tylko zamówienia z błędną sumą
+            wrong = list(
+                Order.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+                .with_totals()
+                .exclude(total=F('computed_total'))
+                .values_list('pk', 'total', 'computed_total')
+            )
+            for pk, total, computed_total in wrong:
+                self.stdout.write(f'Order {pk}: total={total:.2f}, lines={computed_total:.2f}')
+            if wrong and options['fix']:
+                Order.objects.filter(pk__in=[pk for pk, _, _ in wrong]).refresh_totals()
+
+            checked += len(pks)
+            mismatched += len(wrong)
+            last_pk = pks[-1]
+
+        action = 'fixed' if options['fix'] else 'found'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} orders, {action} {mismatched} mismatched totals'))
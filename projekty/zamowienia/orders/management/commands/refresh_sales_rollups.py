@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.reports import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Odświeża tabele DailyCategoryRevenue / DailyCustomerRevenue (przyrostowo od ostatniego odświeżenia)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Przelicza od tego dnia (YYYY-MM-DD), np. po zmianie starszych zamówień')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        days = refresh_rollups(since=since)
+        self.stdout.write(self.style.SUCCESS(f'Refreshed sales rollups for {days} days'))
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def snapshot_prices_and_totals(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderProduct = apps.get_model("orders", "OrderProduct")
+    Product = apps.get_model("orders", "Product")
+
+    # istniejące pozycje dostają bieżącą cenę produktu (historii cen nie mamy)
+    OrderProduct.objects.update(
+        unit_price=Subquery(Product.objects.filter(pk=OuterRef("product_id")).values("price")[:1])
+    )
+    line_total = DecimalField(max_digits=12, decimal_places=2)
+    lines_total = (
+        OrderProduct.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(total=Sum(F("quantity") * F("unit_price"), output_field=line_total))
+        .values("total")
+    )
+    Order.objects.update(total=Coalesce(
+        Subquery(lines_total, output_field=line_total), Value(Decimal("0.00")), output_field=line_total,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="total",
+            field=models.DecimalField(
+                db_index=True,
+                decimal_places=2,
+                default=Decimal("0.00"),
+                editable=False,
+                max_digits=12,
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderproduct",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(snapshot_prices_and_totals, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="orderproduct",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_order_total_orderproduct_unit_price"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCategoryRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("revenue", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("quantity", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyCustomerRevenue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("revenue", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("orders", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SalesRollupState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("refreshed_until", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["created_at", "customer", "total"],
+                name="order_created_customer_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailycategoryrevenue",
+            name="category",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_revenue",
+                to="orders.category",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailycustomerrevenue",
+            name="customer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_revenue",
+                to="orders.customer",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycategoryrevenue",
+            constraint=models.UniqueConstraint(
+                fields=("day", "category"), name="daily_category_revenue_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycustomerrevenue",
+            constraint=models.UniqueConstraint(
+                fields=("day", "customer"), name="daily_customer_revenue_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    from orders import hierarchy
+
+    hierarchy.rebuild_paths(apps.get_model("orders", "Employee"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_sales_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employee",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_employee_path"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="employee",
+            name="path",
+            field=models.TextField(db_index=True, default="", editable=False),
+        ),
+    ]
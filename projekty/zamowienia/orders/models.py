@@ -1,4 +1,13 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import hierarchy
+
+# wartość pozycji: ilość * cena z chwili zamówienia (w bazie, bez ładowania pozycji)
+LINE_TOTAL_FIELD = DecimalField(max_digits=12, decimal_places=2)
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -15,27 +24,125 @@ class Customer(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
 
+class OrderQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Dodaje computed_total - sumę ilość * cena wszystkich pozycji, liczoną
+        w SQL (jedno zapytanie dla całej listy zamówień, bez pozycji i produktów).
+        Zamówienie bez pozycji ma 0.
+
+        Na co dzień wystarcza kolumna Order.total - to jest wartość
+        referencyjna, np. do uzgadniania (reconcile_order_totals).
+        """
+        line_total = F('order_products__quantity') * F('order_products__unit_price')
+        return self.annotate(computed_total=Coalesce(
+            Sum(line_total, output_field=LINE_TOTAL_FIELD),
+            Value(Decimal('0.00')),
+            output_field=LINE_TOTAL_FIELD,
+        ))
+
+    def refresh_totals(self):
+        """
+        Przelicza Order.total z pozycji jednym UPDATE ... SET total = (SELECT SUM ...).
+        Zwraca liczbę zamówień.
+        """
+        lines_total = (
+            OrderProduct.objects.filter(order=OuterRef('pk'))
+            .order_by()
+            .values('order')
+            .annotate(total=Sum(F('quantity') * F('unit_price'), output_field=LINE_TOTAL_FIELD))
+            .values('total')
+        )
+        return self.update(total=Coalesce(
+            Subquery(lines_total, output_field=LINE_TOTAL_FIELD),
+            Value(Decimal('0.00')),
+            output_field=LINE_TOTAL_FIELD,
+        ))
+
+
 class Order(models.Model):
     """
     Model reprezentujący zamówienie złożone przez klienta.
     Zawiera informacje o kliencie i dacie utworzenia.
-    Łączna kwota zamówienia jest obliczana na podstawie produktów w zamówieniu.
+    Łączna kwota zamówienia (total) jest zapisana w tabeli i aktualizowana
+    w tej samej transakcji co pozycje zamówienia (OrderProduct).
 
     Klient może mieć wiele zamówień
     Zamówienie należy do jednego klienta
     """
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), db_index=True, editable=False)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # raporty sprzedaży (orders.reports) - zakres dat i suma bez czytania pozycji
+            models.Index(fields=['created_at', 'customer', 'total'], name='order_created_customer_idx'),
+        ]
+
     @property
     def total_price(self):
         """
-        Oblicza łączną kwotę zamówienia na podstawie cen produktów i ich ilości.
+        Łączna kwota zamówienia (ilość * cena z chwili zamówienia).
+
+        Z Order.objects.with_totals() zwraca wartość policzoną z pozycji,
+        w przeciwnym razie zapisaną kolumnę total (bez zapytań).
         """
-        return sum(
-            order_product.line_total
-            for order_product in self.orderproduct_set.all()
-        )
+        if 'computed_total' in self.__dict__:
+            return self.computed_total
+        return self.total
+
+class OrderProductQuerySet(models.QuerySet):
+    """
+    Operacje masowe omijają OrderProduct.save() / delete(), więc tutaj też
+    uzupełniamy unit_price i przeliczamy Order.total zmienionych zamówień.
+    Pozostałe ścieżki (np. kaskadowe usunięcie produktu) naprawia
+    python manage.py reconcile_order_totals --fix
+    """
+
+    def with_line_totals(self):
+        """Dodaje computed_line_total = ilość * cena z chwili zamówienia, liczone w SQL."""
+        return self.annotate(computed_line_total=models.ExpressionWrapper(
+            F('quantity') * F('unit_price'),
+            output_field=LINE_TOTAL_FIELD,
+        ))
+
+    def _order_ids(self):
+        return set(self.order_by().values_list('order_id', flat=True).distinct())
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        missing = {obj.product_id for obj in objs if obj.unit_price is None}
+        prices = dict(Product.objects.filter(pk__in=missing).values_list('pk', 'price'))
+        for obj in objs:
+            if obj.unit_price is None:
+                obj.unit_price = prices[obj.product_id]
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            Order.objects.filter(pk__in={obj.order_id for obj in objs}).refresh_totals()
+        return created
+
+    def update(self, **kwargs):
+        if not {'quantity', 'unit_price', 'order', 'order_id'} & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            order_ids = self._order_ids()
+            updated = super().update(**kwargs)
+            target = kwargs.get('order_id', kwargs.get('order'))
+            if target is not None:
+                order_ids.add(getattr(target, 'pk', target))
+            Order.objects.filter(pk__in=order_ids).refresh_totals()
+        return updated
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            order_ids = self._order_ids()
+            deleted = super().delete()
+            Order.objects.filter(pk__in=order_ids).refresh_totals()
+        return deleted
+
 
 class OrderProduct(models.Model):
     """
@@ -53,14 +160,118 @@ class OrderProduct(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='order_products')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
-    
+    # cena produktu w chwili zamówienia - późniejsza zmiana Product.price nie zmienia zamówień
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    objects = OrderProductQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # przeniesienie pozycji do innego zamówienia zmienia sumy obu zamówień
+        instance._loaded_order_id = instance.__dict__.get('order_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.unit_price is None:
+            self.unit_price = self.product.price
+        order_ids = {self.order_id, getattr(self, '_loaded_order_id', None)} - {None}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Order.objects.filter(pk__in=order_ids).refresh_totals()
+        self._loaded_order_id = self.order_id
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            Order.objects.filter(pk=self.order_id).refresh_totals()
+        return deleted
+
     @property
     def line_total(self):
         """
-        Oblicza wartość pozycji zamówienia (cena * ilość).
+        Oblicza wartość pozycji zamówienia (cena z chwili zamówienia * ilość).
         """
-        return self.product.price * self.quantity
+        if 'computed_line_total' in self.__dict__:
+            return self.computed_line_total
+        return self.unit_price * self.quantity
+
+class EmployeeQuerySet(models.QuerySet):
+    def org_chart(self):
+        """Drzewo pracowników z .children, .level i .headcount - jedno zapytanie."""
+        return hierarchy.org_chart(self)
+
+    def rebuild_paths(self):
+        hierarchy.rebuild_paths(self.model)
+
 
 class Employee(models.Model):
+    """
+    Pracownik i jego przełożony. Zapytania o hierarchię (przełożeni,
+    podwładni, poziom, liczebność zespołu) - orders.hierarchy.
+    """
     name = models.CharField(max_length=100)
-    manager = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
\ No newline at end of file
+    manager = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
+    # zmaterializowana ścieżka "/1/5/9/" (tryb 'path' w orders.hierarchy);
+    # bez max_length - długość ogranicza hierarchy.MAX_DEPTH, a nie liczba znaków
+    path = models.TextField(default='', editable=False, db_index=True)
+
+    objects = EmployeeQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        manager_path = '/'
+        if self.manager_id:
+            manager_path = Employee.objects.filter(pk=self.manager_id).values_list('path', flat=True).get()
+            if self.pk and f'/{self.pk}/' in manager_path:
+                raise ValueError('An employee cannot report to their own subordinate')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            hierarchy.update_path(self, manager_path)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            hierarchy.detach_subtree(self)
+            return super().delete(*args, **kwargs)
+
+    def ancestors(self):
+        return hierarchy.ancestors(self)
+
+    def descendants(self):
+        return hierarchy.descendants(self)
+
+    def depth(self):
+        return hierarchy.depth(self)
+
+    def subtree_headcount(self):
+        return hierarchy.subtree_headcount(self)
+
+
+class DailyCategoryRevenue(models.Model):
+    """Zagregowana sprzedaż kategorii w danym dniu (orders.reports.refresh_rollups)."""
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_revenue')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], name='daily_category_revenue_unique'),
+        ]
+
+
+class DailyCustomerRevenue(models.Model):
+    """Zagregowana sprzedaż klienta w danym dniu (orders.reports.refresh_rollups)."""
+    day = models.DateField()
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='daily_revenue')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    orders = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'customer'], name='daily_customer_revenue_unique'),
+        ]
+
+
+class SalesRollupState(models.Model):
+    """Do kiedy (Order.created_at) tabele Daily*Revenue są przeliczone - jeden wiersz."""
+    refreshed_until = models.DateTimeField()
@@ -0,0 +1,201 @@
+"""
+Raporty sprzedaży: przychód wg kategorii, klienta i okresu (dzień / tydzień / miesiąc).
+
+Każdy raport to jedno zapytanie z GROUP BY (queryset .values() - wiersze jako
+słowniki). Źródła danych:
+
+- rollup=False - dane bieżące: kategorie z OrderProduct (ilość * unit_price),
+  klienci i okresy z Order.total (bez czytania pozycji),
+- rollup=True  - tabele DailyCategoryRevenue / DailyCustomerRevenue, czyli
+  kilka wierszy na dzień zamiast wszystkich pozycji zamówień (dashboardy).
+
+Tabele rollup odświeża przyrostowo refresh_rollups() - od zapisanego
+SalesRollupState.refreshed_until, zawsze pełnymi dniami:
+
+    python manage.py refresh_sales_rollups            # nowe zamówienia
+    python manage.py refresh_sales_rollups --since 2025-01-01   # po zmianach starszych zamówień
+
+Eksport: stream_csv() / stream_json() zwracają generatory dla StreamingHttpResponse.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, DateField, F, Min, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from .models import (
+    LINE_TOTAL_FIELD, DailyCategoryRevenue, DailyCustomerRevenue, Order, OrderProduct, SalesRollupState,
+)
+
+PERIODS = ('day', 'week', 'month')
+CENT = Decimal('0.01')
+CHUNK_SIZE = 2000
+
+
+def _date_range(queryset, field, start, end):
+    """start / end (date) - przedział [start, end], po stronie bazy jako zakres (indeks)."""
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': _day_start(start)})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': _day_start(end + timedelta(days=1))})
+    return queryset
+
+
+def _day_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+    return queryset
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def category_revenue(start=None, end=None, rollup=False):
+    """Wiersze: category_id, category_name, amount, units - od największego przychodu."""
+    if rollup:
+        queryset = _day_range(DailyCategoryRevenue.objects.all(), start, end)
+        queryset = queryset.values('category_id', category_name=F('category__name')).annotate(
+            amount=Sum('revenue'), units=Sum('quantity'),
+        )
+    else:
+        queryset = _date_range(OrderProduct.objects.all(), 'order__created_at', start, end)
+        queryset = queryset.values(
+            category_id=F('product__category_id'), category_name=F('product__category__name'),
+        ).annotate(
+            amount=Sum(F('quantity') * F('unit_price'), output_field=LINE_TOTAL_FIELD),
+            units=Sum('quantity'),
+        )
+    return queryset.order_by('-amount', 'category_id')
+
+
+def customer_revenue(start=None, end=None, rollup=False):
+    """Wiersze: customer_id, customer_name, amount, order_count - od największego przychodu."""
+    if rollup:
+        queryset = _day_range(DailyCustomerRevenue.objects.all(), start, end)
+        queryset = queryset.values('customer_id', customer_name=F('customer__name')).annotate(
+            amount=Sum('revenue'), order_count=Sum('orders'),
+        )
+    else:
+        queryset = _date_range(Order.objects.all(), 'created_at', start, end)
+        queryset = queryset.values('customer_id', customer_name=F('customer__name')).annotate(
+            amount=Sum('total'), order_count=Count('id'),
+        )
+    return queryset.order_by('-amount', 'customer_id')
+
+
+def period_revenue(period='day', start=None, end=None, rollup=False):
+    """Wiersze: period (początek dnia / tygodnia / miesiąca), amount, order_count - chronologicznie."""
+    if period not in PERIODS:
+        raise ValueError(f'Unknown period: {period}')
+
+    if rollup:
+        queryset = _day_range(DailyCustomerRevenue.objects.all(), start, end)
+        queryset = queryset.values(period=Trunc('day', period, output_field=DateField())).annotate(
+            amount=Sum('revenue'), order_count=Sum('orders'),
+        )
+    else:
+        queryset = _date_range(Order.objects.all(), 'created_at', start, end)
+        queryset = queryset.values(period=Trunc('created_at', period, output_field=DateField())).annotate(
+            amount=Sum('total'), order_count=Count('id'),
+        )
+    return queryset.order_by('period')
+
+
+REPORTS = {
+    'category': (category_revenue, ('category_id', 'category_name', 'amount', 'units')),
+    'customer': (customer_revenue, ('customer_id', 'customer_name', 'amount', 'order_count')),
+    'period': (period_revenue, ('period', 'amount', 'order_count')),
+}
+
+
+def refresh_rollups(since=None, until=None):
+    """
+    Przelicza DailyCategoryRevenue / DailyCustomerRevenue dla dni od since
+    (domyślnie: od zapisanego refreshed_until) do until (domyślnie teraz).
+
+    Dzień, w którym wypada since, jest liczony od nowa w całości, więc
+    częściowo policzony ostatni dzień uzupełni się przy następnym odświeżeniu.
+    Zwraca liczbę przeliczonych dni.
+    """
+    until = until or timezone.now()
+    state = SalesRollupState.objects.first()
+    if since is None:
+        since = state.refreshed_until if state else Order.objects.aggregate(first=Min('created_at'))['first']
+    if since is None:
+        return 0
+
+    first_day = timezone.localtime(since).date() if isinstance(since, datetime) else since
+    orders = Order.objects.filter(created_at__gte=_day_start(first_day), created_at__lt=until)
+    lines = OrderProduct.objects.filter(order__in=orders)
+
+    with transaction.atomic():
+        DailyCategoryRevenue.objects.filter(day__gte=first_day).delete()
+        DailyCustomerRevenue.objects.filter(day__gte=first_day).delete()
+
+        categories = lines.values(
+            day=TruncDate('order__created_at'), category_id=F('product__category_id'),
+        ).annotate(
+            amount=Sum(F('quantity') * F('unit_price'), output_field=LINE_TOTAL_FIELD),
+            units=Sum('quantity'),
+        ).order_by()
+        DailyCategoryRevenue.objects.bulk_create(
+            (
+                DailyCategoryRevenue(day=row['day'], category_id=row['category_id'],
+                                     revenue=row['amount'], quantity=row['units'])
+                for row in categories.iterator(chunk_size=CHUNK_SIZE)
+            ),
+            batch_size=CHUNK_SIZE,
+        )
+
+        customers = orders.values('customer_id', day=TruncDate('created_at')).annotate(
+            amount=Sum('total'), order_count=Count('id'),
+        ).order_by()
+        DailyCustomerRevenue.objects.bulk_create(
+            (
+                DailyCustomerRevenue(day=row['day'], customer_id=row['customer_id'],
+                                     revenue=row['amount'], orders=row['order_count'])
+                for row in customers.iterator(chunk_size=CHUNK_SIZE)
+            ),
+            batch_size=CHUNK_SIZE,
+        )
+
+        SalesRollupState.objects.update_or_create(pk=1, defaults={'refreshed_until': until})
+
+    return (timezone.localtime(until).date() - first_day).days + 1
+
+
+def _export_value(value):
+    # sqlite zwraca sumy bez skali (Decimal('160')) - w eksporcie zawsze dwa miejsca po przecinku
+    if isinstance(value, Decimal):
+        return value.quantize(CENT)
+    return value
+
+
+class _Echo:
+    """Obiekt "pliku" dla csv.writer - zwraca wiersz zamiast go zapisywać."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield writer.writerow([_export_value(row[column]) for column in columns])
+
+
+def stream_json(rows, columns):
+    yield '['
+    for i, row in enumerate(rows.iterator(chunk_size=CHUNK_SIZE)):
+        item = {column: _export_value(row[column]) for column in columns}
+        yield (',' if i else '') + json.dumps(item, cls=DjangoJSONEncoder)
+    yield ']'
@@ -1,2 +1,382 @@
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from . import benchmarks, builders, hierarchy, reports
+from .builders import BulkOrderBuilder
+from .factories import (
+    CategoryFactory, CustomerFactory, EmployeeFactory, OrderFactory, OrderProductFactory, ProductFactory,
+)
+from .models import Customer, DailyCustomerRevenue, Employee, Order, OrderProduct, Product
 
 # Create your tests here.
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        self.cheap = ProductFactory(price=Decimal('2.50'))
+        self.expensive = ProductFactory(price=Decimal('100.00'))
+        self.customer = CustomerFactory()
+
+        self.order = OrderFactory(customer=self.customer)
+        OrderProductFactory(order=self.order, product=self.cheap, quantity=4)
+        OrderProductFactory(order=self.order, product=self.expensive, quantity=1)
+        self.empty = OrderFactory(customer=self.customer)
+
+    def test_with_totals(self):
+        orders = Order.objects.with_totals().order_by('pk')
+        self.assertEqual([o.computed_total for o in orders], [Decimal('110.00'), Decimal('0.00')])
+
+    def test_listing_with_totals_is_one_query(self):
+        for _ in range(20):
+            order = OrderFactory(customer=self.customer)
+            OrderProductFactory.create_batch(3, order=order, product=self.cheap, quantity=2)
+
+        with self.assertNumQueries(1):
+            totals = [order.total_price for order in Order.objects.with_totals()]
+        self.assertEqual(len(totals), 22)
+        self.assertEqual(totals.count(Decimal('15.00')), 20)
+
+    def test_total_price_without_annotation(self):
+        order = Order.objects.get(pk=self.order.pk)
+        with self.assertNumQueries(0):  # zapisana kolumna Order.total
+            self.assertEqual(order.total_price, Decimal('110.00'))
+        self.assertEqual(self.empty.total_price, Decimal('0.00'))
+
+    def test_line_totals(self):
+        lines = OrderProduct.objects.with_line_totals().order_by('pk')
+        with self.assertNumQueries(1):
+            self.assertEqual([line.line_total for line in lines], [Decimal('10.00'), Decimal('100.00')])
+
+
+class BulkOrderBuilderTests(TestCase):
+    def build(self, seed=7):
+        return BulkOrderBuilder(seed=seed, categories=3, products=10, customers=5, batch_size=4).build(orders=10)
+
+    def snapshot(self):
+        return (
+            list(Customer.objects.order_by('pk').values_list('name', 'email')),
+            list(Product.objects.order_by('pk').values_list('name', 'price', 'category__name')),
+            list(OrderProduct.objects.order_by('pk').values_list(
+                'order__customer__email', 'order__created_at', 'product__name', 'quantity', 'unit_price')),
+        )
+
+    def test_builds_shared_parents_and_consistent_totals(self):
+        stats = self.build()
+
+        self.assertEqual(stats['orders'], 10)
+        self.assertEqual(Order.objects.count(), 10)
+        self.assertEqual(Customer.objects.count(), 5)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(OrderProduct.objects.count(), stats['lines'])
+        self.assertGreaterEqual(stats['lines'], 10)
+        for order in Order.objects.with_totals():
+            self.assertEqual(order.total, order.computed_total)
+        for line in OrderProduct.objects.select_related('product'):
+            self.assertEqual(line.unit_price, line.product.price)
+        # daty wylosowane wstecz od stałego punktu, a pole modelu nietknięte
+        dates = Order.objects.values_list('created_at', flat=True)
+        self.assertTrue(all(date <= builders.DEFAULT_ANCHOR for date in dates))
+        self.assertTrue(Order._meta.get_field('created_at').auto_now_add)
+
+    def test_same_seed_gives_same_data(self):
+        self.build()
+        first = self.snapshot()
+        for model in (OrderProduct, Order, Product, Customer):
+            model.objects.all().delete()
+
+        self.build()
+        self.assertEqual(self.snapshot(), first)
+
+    def test_generate_orders_command(self):
+        out = io.StringIO()
+        call_command('generate_orders', orders=3, customers=2, products=2, categories=1, seed=1, stdout=out)
+
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertIn('Created 3 orders', out.getvalue())
+
+
+class BenchmarkTests(TestCase):
+    def test_scenarios_do_not_scale_queries_with_data(self):
+        results = benchmarks.run_benchmarks(scales=[30, 150], repeat=1)
+
+        self.assertEqual(set(results['scales']), {'30', '150'})
+        for result in results['scales'].values():
+            self.assertEqual(set(result['scenarios']), set(benchmarks.SCENARIOS))
+            self.assertGreater(result['lines'], 0)
+        self.assertEqual(benchmarks.compare(results), [])
+        # dane są wycofywane po pomiarze
+        self.assertFalse(Order.objects.exists())
+
+    def test_detects_n_plus_one(self):
+        def listing_without_select_related(state):
+            return [order.customer.name for order in Order.objects.order_by('pk')[:50]]
+
+        results = benchmarks.run_benchmarks(
+            scales=[6, 60], repeat=1, scenarios={'listing': listing_without_select_related},
+        )
+
+        problems = benchmarks.compare(results)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('N+1', problems[0])
+
+    def test_compare_with_baseline(self):
+        def result(queries, seconds):
+            return {'scales': {'1000': {'scenarios': {'order_listing': {
+                'queries': queries, 'seconds': seconds, 'peak_kib': 1.0,
+            }}}}}
+
+        self.assertEqual(benchmarks.compare(result(2, 0.105), result(2, 0.1)), [])
+        # szum poniżej min_delta nie jest regresją
+        self.assertEqual(benchmarks.compare(result(2, 0.004), result(2, 0.001)), [])
+        self.assertEqual(len(benchmarks.compare(result(3, 0.1), result(2, 0.1))), 1)
+        self.assertEqual(len(benchmarks.compare(result(2, 0.5), result(2, 0.1))), 1)
+
+    def test_command_saves_results_and_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command('benchmark_orders', scales=[30], repeat=1, output=output, stdout=io.StringIO())
+            with open(output) as f:
+                results = json.load(f)
+            self.assertIn('order_listing', results['scales']['30']['scenarios'])
+
+            results['scales']['30']['scenarios']['order_listing']['queries'] = 0
+            baseline = os.path.join(tmp, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump(results, f)
+            with self.assertRaisesMessage(CommandError, 'order_listing @ 30'):
+                call_command('benchmark_orders', scales=[30], repeat=1, baseline=baseline, stdout=io.StringIO())
+
+
+class MaterializedTotalsTests(TestCase):
+    def setUp(self):
+        self.product = ProductFactory(price=Decimal('10.00'))
+        self.order = OrderFactory()
+        self.line = OrderProductFactory(order=self.order, product=self.product, quantity=3)
+
+    def total(self, order=None):
+        return Order.objects.values_list('total', flat=True).get(pk=(order or self.order).pk)
+
+    def test_price_is_snapshotted(self):
+        self.assertEqual(self.line.unit_price, Decimal('10.00'))
+        self.product.price = Decimal('99.00')
+        self.product.save()
+
+        self.assertEqual(self.total(), Decimal('30.00'))
+        self.assertEqual(Order.objects.with_totals().get(pk=self.order.pk).computed_total, Decimal('30.00'))
+
+    def test_total_follows_line_changes(self):
+        self.line.quantity = 5
+        self.line.save()
+        self.assertEqual(self.total(), Decimal('50.00'))
+
+        other = OrderFactory()
+        self.line.order = other
+        self.line.save()
+        self.assertEqual((self.total(), self.total(other)), (Decimal('0.00'), Decimal('50.00')))
+
+        self.line.delete()
+        self.assertEqual(self.total(other), Decimal('0.00'))
+
+    def test_bulk_operations_keep_totals(self):
+        OrderProduct.objects.bulk_create([
+            OrderProduct(order=self.order, product=self.product, quantity=2),
+            OrderProduct(order=self.order, product=self.product, quantity=1, unit_price=Decimal('1.00')),
+        ])
+        self.assertEqual(self.total(), Decimal('51.00'))
+
+        OrderProduct.objects.filter(order=self.order).update(quantity=1)
+        self.assertEqual(self.total(), Decimal('21.00'))
+
+        OrderProduct.objects.filter(unit_price=Decimal('1.00')).delete()
+        self.assertEqual(self.total(), Decimal('20.00'))
+
+    def test_reconcile_command(self):
+        Order.objects.filter(pk=self.order.pk).update(total=Decimal('1.00'))
+
+        out = io.StringIO()
+        call_command('reconcile_order_totals', stdout=out)
+        self.assertIn(f'Order {self.order.pk}: total=1.00, lines=30.00', out.getvalue())
+        self.assertEqual(self.total(), Decimal('1.00'))
+
+        out = io.StringIO()
+        call_command('reconcile_order_totals', '--fix', '--batch-size', '1', stdout=out)
+        self.assertIn('fixed 1 mismatched', out.getvalue())
+        self.assertEqual(self.total(), Decimal('30.00'))
+
+
+class SalesReportTests(TestCase):
+    def setUp(self):
+        self.books, self.games = CategoryFactory(name='Książki'), CategoryFactory(name='Gry')
+        book = ProductFactory(category=self.books, price=Decimal('20.00'))
+        game = ProductFactory(category=self.games, price=Decimal('100.00'))
+        self.alice, self.bob = CustomerFactory(name='Alicja'), CustomerFactory(name='Bob')
+
+        days = [datetime(2025, 1, 6, 10, tzinfo=dt_timezone.utc), datetime(2025, 1, 7, 10, tzinfo=dt_timezone.utc),
+                datetime(2025, 2, 3, 10, tzinfo=dt_timezone.utc)]
+        for day, customer, lines in [
+            (days[0], self.alice, [(book, 2), (game, 1)]),  # 140
+            (days[1], self.bob, [(book, 1)]),               # 20
+            (days[2], self.alice, [(game, 2)]),             # 200
+        ]:
+            order = OrderFactory(customer=customer)
+            Order.objects.filter(pk=order.pk).update(created_at=day)  # auto_now_add
+            for product, quantity in lines:
+                OrderProductFactory(order=order, product=product, quantity=quantity)
+
+    def rows(self, queryset, *columns):
+        return [tuple(row[column] for column in columns) for row in queryset]
+
+    def test_reports_are_single_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.rows(reports.category_revenue(), 'category_name', 'amount', 'units'),
+                [('Gry', Decimal('300.00'), 3), ('Książki', Decimal('60.00'), 3)],
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.rows(reports.customer_revenue(end=date(2025, 1, 31)), 'customer_name', 'amount', 'order_count'),
+                [('Alicja', Decimal('140.00'), 1), ('Bob', Decimal('20.00'), 1)],
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.rows(reports.period_revenue('month'), 'period', 'amount', 'order_count'),
+                [(date(2025, 1, 1), Decimal('160.00'), 2), (date(2025, 2, 1), Decimal('200.00'), 1)],
+            )
+
+    def test_rollups_match_live_data(self):
+        until = datetime(2025, 1, 7, 12, tzinfo=dt_timezone.utc)
+        reports.refresh_rollups(until=until)
+        self.assertEqual(DailyCustomerRevenue.objects.count(), 2)
+
+        # przyrostowo: tylko dni od poprzedniego odświeżenia
+        call_command('refresh_sales_rollups', stdout=io.StringIO())
+        for period in reports.PERIODS:
+            self.assertEqual(
+                list(reports.period_revenue(period, rollup=True)), list(reports.period_revenue(period)),
+            )
+        self.assertEqual(list(reports.category_revenue(rollup=True)), list(reports.category_revenue()))
+        self.assertEqual(
+            list(reports.customer_revenue(start=date(2025, 2, 1), rollup=True)),
+            list(reports.customer_revenue(start=date(2025, 2, 1))),
+        )
+
+    def test_export_view(self):
+        self.client.force_login(User.objects.create_user('analyst'))
+        url = reverse('sales_report', args=['period'])
+
+        response = self.client.get(url, {'period': 'month', 'format': 'csv'})
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'period,amount,order_count', '2025-01-01,160.00,2', '2025-02-01,200.00,1',
+        ])
+
+        response = self.client.get(reverse('sales_report', args=['category']), {'start': '2025-02-01'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [
+            {'category_id': self.games.pk, 'category_name': 'Gry', 'amount': '200.00', 'units': 2},
+        ])
+
+        self.assertEqual(self.client.get(url, {'period': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': 'wczoraj'}).status_code, 400)
+
+
+class EmployeeHierarchyTests(TestCase):
+    """
+    ceo
+    ├── cto
+    │   ├── dev1
+    │   │   └── intern
+    │   └── dev2
+    └── cfo
+    """
+
+    def setUp(self):
+        self.ceo = EmployeeFactory(name='ceo')
+        self.cto = EmployeeFactory(name='cto', manager=self.ceo)
+        self.cfo = EmployeeFactory(name='cfo', manager=self.ceo)
+        self.dev1 = EmployeeFactory(name='dev1', manager=self.cto)
+        self.dev2 = EmployeeFactory(name='dev2', manager=self.cto)
+        self.intern = EmployeeFactory(name='intern', manager=self.dev1)
+
+    def names(self, employees):
+        return [employee.name for employee in employees]
+
+    def check_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(self.intern.ancestors()), ['dev1', 'cto', 'ceo'])
+        with self.assertNumQueries(1):
+            descendants = self.ceo.descendants()
+        self.assertEqual(self.names(descendants), ['cto', 'cfo', 'dev1', 'dev2', 'intern'])
+        self.assertEqual([e.distance for e in descendants], [1, 1, 2, 2, 3])
+        self.assertEqual((self.intern.depth(), self.ceo.depth()), (3, 0))
+        self.assertEqual((self.ceo.subtree_headcount(), self.cto.subtree_headcount(), self.cfo.subtree_headcount()), (5, 3, 0))
+
+    def test_cte_mode(self):
+        with self.settings(ORDERS_EMPLOYEE_HIERARCHY='cte'):
+            self.check_queries()
+
+    def test_path_mode(self):
+        with self.settings(ORDERS_EMPLOYEE_HIERARCHY='path'):
+            self.check_queries()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.intern.depth(), 3)
+
+    def test_paths_follow_changes(self):
+        self.cto.manager = self.cfo
+        self.cto.save()
+        self.intern.refresh_from_db()
+        self.assertEqual(self.intern.path, f'/{self.ceo.pk}/{self.cfo.pk}/{self.cto.pk}/{self.dev1.pk}/{self.intern.pk}/')
+
+        with self.assertRaises(ValueError):
+            self.ceo.manager = self.intern
+            self.ceo.save()
+
+        self.cfo.delete()
+        self.intern.refresh_from_db()
+        self.assertEqual(self.intern.path, f'/{self.cto.pk}/{self.dev1.pk}/{self.intern.pk}/')
+
+        paths = dict(Employee.objects.values_list('pk', 'path'))
+        Employee.objects.update(path='')
+        Employee.objects.rebuild_paths()
+        self.assertEqual(dict(Employee.objects.values_list('pk', 'path')), paths)
+
+    def test_path_subtree_is_prefix(self):
+        # '/<ceo>/' nie może złapać '/<ceo>0/' ani samego ceo
+        query = str(Employee.objects.filter(hierarchy.subtree(self.ceo.path)).query)
+        self.assertIn('LIKE', query)
+        self.assertNotIn('<', query)
+        with self.settings(ORDERS_EMPLOYEE_HIERARCHY='path'):
+            for i in range(10):
+                EmployeeFactory(name=f'other{i}')
+            self.assertTrue(Employee.objects.filter(path=f'/{self.ceo.pk}0/').exists())
+            self.assertEqual(self.ceo.subtree_headcount(), 5)
+            self.assertEqual(self.names(self.cto.descendants()), ['dev1', 'dev2', 'intern'])
+
+    def test_depth_limit(self):
+        with mock.patch.object(hierarchy, 'MAX_DEPTH', 3):
+            with self.assertRaises(ValueError):
+                EmployeeFactory(name='intern2', manager=self.intern)
+            # przeniesienie poddrzewa cto (2 poziomy pod nim) pod cfo - intern na poziomie 4
+            self.cto.manager = self.cfo
+            with self.assertRaises(ValueError):
+                self.cto.save()
+        self.assertFalse(Employee.objects.filter(name='intern2').exists())
+        self.intern.refresh_from_db()
+        self.assertEqual(self.intern.path, f'/{self.ceo.pk}/{self.cto.pk}/{self.dev1.pk}/{self.intern.pk}/')
+
+    def test_org_chart_page(self):
+        self.client.force_login(User.objects.create_user('hr'))
+        for i in range(20):
+            EmployeeFactory(name=f'dev{i + 3}', manager=self.dev2)
+        with self.assertNumQueries(3):  # sesja, użytkownik, pracownicy
+            response = self.client.get(reverse('org_chart'))
+        self.assertContains(response, 'ceo <small>(zespół: 25)</small>')
+        self.assertContains(response, 'dev2 <small>(zespół: 20)</small>')
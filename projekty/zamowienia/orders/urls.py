@@ -6,4 +6,6 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', LogoutView.as_view(next_page='/login/'), name='logout'),
     path('', views.home, name='home'),
+    path('reports/<str:name>/', views.sales_report, name='sales_report'),
+    path('employees/', views.org_chart, name='org_chart'),
 ] 
\ No newline at end of file
@@ -1,8 +1,14 @@
+from datetime import date
+
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 
+from . import reports
+from .models import Employee
+
 # Create your views here.
 
 def login_view(request):
@@ -22,3 +28,37 @@ def login_view(request):
 @login_required
 def home(request):
     return render(request, 'orders/home.html')
+
+
+@login_required
+def org_chart(request):
+    # całe drzewo z jednego zapytania - liczba zapytań nie zależy od liczby pracowników
+    return render(request, 'orders/org_chart.html', {'roots': Employee.objects.org_chart()})
+
+
+@login_required
+def sales_report(request, name):
+    """
+    GET /reports/<category|customer|period>/?format=csv&period=month&start=2025-01-01&end=2025-01-31&rollup=1
+
+    Wiersze raportu (orders.reports) strumieniowane jako JSON (domyślnie) albo CSV.
+    """
+    if name not in reports.REPORTS:
+        raise Http404('Unknown report')
+    report, columns = reports.REPORTS[name]
+
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+        kwargs = {'start': start, 'end': end, 'rollup': request.GET.get('rollup') == '1'}
+        if name == 'period':
+            kwargs['period'] = request.GET.get('period', 'day')
+        rows = report(**kwargs)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if request.GET.get('format') == 'csv':
+        response = StreamingHttpResponse(reports.stream_csv(rows, columns), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{name}.csv"'
+        return response
+    return StreamingHttpResponse(reports.stream_json(rows, columns), content_type='application/json')